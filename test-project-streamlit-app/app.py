@@ -1,4 +1,5 @@
 # File: app.py
+import logging
 import streamlit as st
 import os
 
@@ -6,17 +7,33 @@ import os
 st.set_page_config(layout="wide", page_title="Country Currency Database", page_icon="🌎")
 
 from src.database import DatabaseManager
+from src import lookup
+from src.metrics import metrics
 from src.ui import CountryCurrencyUI
 from src.utils import load_css
 
+# Span timings are logged as JSON at DEBUG level
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
 def main():
+    # Expose metrics for Prometheus once per process if a port is configured
+    if os.getenv('METRICS_PORT'):
+        metrics.serve(int(os.getenv('METRICS_PORT')))
+    
+    # Create database manager and start loading data while the page renders. The View tab of
+    # pushdown mode reads only the page shown, so there the table is loaded only once another tab needs it
+    db_manager = DatabaseManager()
+    if db_manager.view_mode != "pushdown":
+        db_manager.prefetch_countries()
+    
+    # Answer currency lookups for other services once per process if a port is configured
+    if os.getenv('LOOKUP_PORT'):
+        lookup.start(db_manager, int(os.getenv('LOOKUP_PORT')))
+    
     # Load CSS
     css_path = os.path.join(os.path.dirname(__file__), "assets", "styles.css")
     st.markdown(load_css(css_path), unsafe_allow_html=True)
     
-    # Create database manager
-    db_manager = DatabaseManager()
-    
     # Create and render UI
     ui = CountryCurrencyUI(db_manager)
     ui.render()
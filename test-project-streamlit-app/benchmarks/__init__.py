@@ -0,0 +1 @@
+# Offline benchmarks: a DuckDB stand-in for the SQL warehouse and synthetic tables
@@ -0,0 +1,150 @@
+# File: benchmarks/fake_sql.py
+import threading
+import time
+
+import duckdb
+import pyarrow as pa
+
+from src.query_builder import COLUMNS, TABLE
+
+SCHEMA = {
+    "country_code": "VARCHAR",
+    "country_number": "INTEGER",
+    "country": "VARCHAR",
+    "currency_name": "VARCHAR",
+    "currency_code": "VARCHAR",
+    "currency_number": "INTEGER",
+}
+READ_STATEMENTS = ("SELECT", "WITH", "DESCRIBE")
+
+
+class FakeConfig:
+    """Stand-in for databricks.sdk.core.Config"""
+    host = "fake-warehouse.local"
+    authenticate = None
+
+
+class FakeSql:
+    """Stand-in for the databricks.sql module backed by an in-memory DuckDB database.
+
+    Every round trip (execute, fetch) sleeps ``latency_ms`` and every new
+    connection ``connect_ms``, to mimic a remote warehouse. Writes bump a
+    table version that DESCRIBE HISTORY reports. table_changes is not
+    emulated, so change data feed reads fail like they would on a table
+    without the feed enabled. Like databricks.sql, it exposes the DB-API
+    error raised when a connection is lost as OperationalError.
+    """
+
+    OperationalError = duckdb.OperationalError
+
+    def __init__(self, latency_ms=0.0, connect_ms=0.0):
+        self.latency = latency_ms / 1000
+        self.connect_latency = connect_ms / 1000
+        self.database = duckdb.connect()
+        catalog, schema, _ = TABLE.split(".")
+        self.database.execute(f"ATTACH ':memory:' AS {catalog}")
+        self.database.execute(f"CREATE SCHEMA {catalog}.{schema}")
+        columns = ", ".join(f"{name} {kind}" for name, kind in SCHEMA.items())
+        self.database.execute(f"CREATE TABLE {TABLE} ({columns})")
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def load(self, frame):
+        """Replace the table's rows with a DataFrame's"""
+        self.database.register("load_frame", frame[COLUMNS])
+        self.database.execute(f"DELETE FROM {TABLE}")
+        self.database.execute(f"INSERT INTO {TABLE} SELECT * FROM load_frame")
+        self.database.unregister("load_frame")
+        self._bump_version()
+
+    def round_trip(self, seconds=None):
+        seconds = self.latency if seconds is None else seconds
+        if seconds:
+            time.sleep(seconds)
+
+    def _bump_version(self):
+        with self._lock:
+            self.version += 1
+
+    def translate(self, query):
+        """Rewrite Databricks-only statements into ones DuckDB understands"""
+        statement = query.lstrip().split(None, 1)[0].upper()
+        if query.lstrip().upper().startswith("DESCRIBE HISTORY"):
+            return f"SELECT {self.version} AS version"
+        if statement not in READ_STATEMENTS:
+            self._bump_version()
+        return query
+
+    def connect(self, **kwargs):
+        self.round_trip(self.connect_latency)
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, sql):
+        self.sql = sql
+        self.open = True
+
+    def cursor(self):
+        return FakeCursor(self.sql, self.sql.database.cursor())
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+
+class FakeCursor:
+    def __init__(self, sql, cursor):
+        self.sql = sql
+        self._cursor = cursor
+        self._reader = None
+        self._pending = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, operation, parameters=None):
+        self.sql.round_trip()
+        self._reader = self._pending = None
+        operation = self.sql.translate(operation)
+        if parameters:
+            self._cursor.execute(operation, list(parameters))
+        else:
+            self._cursor.execute(operation)
+
+    def fetchall(self):
+        self.sql.round_trip()
+        return self._cursor.fetchall()
+
+    def fetchall_arrow(self):
+        self.sql.round_trip()
+        return self._cursor.fetch_arrow_table()
+
+    def fetchmany_arrow(self, size):
+        """Return up to size rows as an Arrow table, reading the result batch by batch"""
+        self.sql.round_trip()
+        if self._reader is None:
+            self._reader = self._cursor.fetch_record_batch(size)
+        batches, rows = [], 0
+        while rows < size:
+            if self._pending is None or self._pending.num_rows == 0:
+                try:
+                    self._pending = self._reader.read_next_batch()
+                except StopIteration:
+                    break
+            batch = self._pending.slice(0, size - rows)
+            self._pending = self._pending.slice(batch.num_rows)
+            batches.append(batch)
+            rows += batch.num_rows
+        return pa.Table.from_batches(batches, schema=self._reader.schema)
+
+    def cancel(self):
+        self._cursor.interrupt()
+
+    def close(self):
+        self._cursor.close()
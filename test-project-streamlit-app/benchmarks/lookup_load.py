@@ -0,0 +1,119 @@
+# File: benchmarks/lookup_load.py
+import argparse
+import http.client
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+# DatabaseManager insists on a warehouse id, and snapshots should not land next to the app's own
+os.environ.setdefault("DATABRICKS_WAREHOUSE_ID", "benchmark")
+os.environ.setdefault("COUNTRY_SNAPSHOT_DIR", tempfile.mkdtemp(prefix="country_benchmark_"))
+
+from benchmarks.fake_sql import FakeConfig, FakeSql
+from benchmarks.synthetic import synthetic_countries
+from src.database import DatabaseManager
+from src.lookup import LookupService
+
+DEFAULT_ROWS = 100_000
+DEFAULT_CLIENTS = [1, 8, 32]
+DEFAULT_BATCHES = [1, 10, 100]
+DEFAULT_SECONDS = 5.0
+
+
+def client(port, paths, deadline, latencies, errors):
+    """Send requests over one keep-alive connection until deadline, recording each latency"""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    while time.perf_counter() < deadline:
+        path = random.choice(paths)
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+
+
+def load(port, paths, clients, seconds):
+    """Run clients concurrent connections for seconds and summarize throughput and latency"""
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(port, paths, deadline, latencies, errors)) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    milliseconds = sorted(seconds * 1000 for seconds in latencies)
+    quantile = lambda q: round(milliseconds[min(len(milliseconds) - 1, int(q * len(milliseconds)))], 3)
+    return {
+        "requests": len(milliseconds),
+        "errors": len(errors),
+        "qps": round(len(milliseconds) / seconds, 1),
+        "p50_ms": quantile(0.5),
+        "p95_ms": quantile(0.95),
+        "p99_ms": quantile(0.99),
+    }
+
+
+def in_process(index, codes, batch, seconds):
+    """Return lookups per second answered straight from the index, without HTTP"""
+    batches = [random.sample(codes, batch) for _ in range(256)]
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        index.currencies_json(batches[calls % len(batches)])
+        calls += 1
+    return round(calls * batch / seconds, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the lookup endpoint against a local DuckDB stand-in")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="table size to generate")
+    parser.add_argument("--clients", type=int, nargs="+", default=DEFAULT_CLIENTS, help="concurrent connections")
+    parser.add_argument("--batch", type=int, nargs="+", default=DEFAULT_BATCHES, help="codes per request")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS, help="duration of each run")
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    sql = FakeSql()
+    sql.load(synthetic_countries(args.rows))
+    db = DatabaseManager(connector=sql, cfg=FakeConfig())
+    started = time.perf_counter()
+    service = LookupService(db)
+    print(f"Built index of {args.rows} rows in {(time.perf_counter() - started) * 1000:.1f} ms")
+    server = service.serve(0, "127.0.0.1")
+    port = server.server_address[1]
+
+    codes = sorted(set(db.get_country_table().values("country_code")))
+    results = []
+    for batch in args.batch:
+        rate = in_process(service.index, codes, batch, min(args.seconds, 1.0))
+        print(f"in-process batch {batch:>4}: {rate:>12,.0f} lookups/s")
+        paths = [f"/currencies?codes={','.join(random.sample(codes, batch))}" for _ in range(256)]
+        for clients in args.clients:
+            result = {"batch": batch, "clients": clients, "in_process_lookups_per_s": rate,
+                      **load(port, paths, clients, args.seconds)}
+            results.append(result)
+            print(f"http batch {batch:>4} clients {clients:>3}: {result['qps']:>9,.0f} req/s "
+                  f"({result['qps'] * batch:>10,.0f} lookups/s)  p50 {result['p50_ms']:.2f} ms  "
+                  f"p99 {result['p99_ms']:.2f} ms  errors {result['errors']}")
+    service.stop()
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"rows": args.rows, "seconds": args.seconds, "results": results}, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
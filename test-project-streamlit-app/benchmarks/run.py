@@ -0,0 +1,223 @@
+# File: benchmarks/run.py
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# DatabaseManager insists on a warehouse id, and snapshots should not land next to the app's own
+os.environ.setdefault("DATABRICKS_WAREHOUSE_ID", "benchmark")
+os.environ.setdefault("COUNTRY_SNAPSHOT_DIR", tempfile.mkdtemp(prefix="country_benchmark_"))
+
+from benchmarks.fake_sql import FakeConfig, FakeSql
+from benchmarks.synthetic import synthetic_countries
+from src.database import DatabaseManager
+from src.metrics import metrics
+
+DEFAULT_ROWS = [265, 10_000, 100_000]
+DEFAULT_REPEAT = 5
+# A p50 this many times slower than in the compared run counts as a regression
+DEFAULT_THRESHOLD = 1.25
+# Timings this short are too noisy to call regressions
+NOISE_FLOOR_MS = 1.0
+# Long enough for the trigram index of the memory mode to answer it
+SEARCH = "ana"
+# Shorter than a trigram, so answered by scanning every name
+SHORT_SEARCH = "an"
+SORT_COLUMN = "currency_name"
+# A country code the synthetic tables never use
+NEW_CODE = "X9X"
+
+
+def measure(function, repeat):
+    """Call function repeat times and return the durations in seconds"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def _require(success):
+    if not success:
+        raise RuntimeError("Benchmark write failed")
+
+
+def _rendered(app):
+    """Return an AppTest after a run, failing the benchmark if the page raised"""
+    if app.exception:
+        raise RuntimeError("Page raised: " + "; ".join(exception.message for exception in app.exception))
+    return app
+
+
+def bench_data_layer(db, repeat):
+    """Yield (name, durations) for table loads and each CRUD method"""
+    yield "get_all_countries.cold", measure(lambda: db.get_all_countries(refresh=True), repeat)
+    yield "get_all_countries.warm", measure(db.get_all_countries, repeat)
+
+    timings = {"add_country": [], "update_country": [], "delete_country": []}
+    for _ in range(repeat):
+        timings["add_country"] += measure(
+            lambda: _require(db.add_country(NEW_CODE, 999, "BENCHMARKIA", "BENCH DOLLAR", "BNC", 999)), 1)
+        timings["update_country"] += measure(
+            lambda: _require(db.update_country(NEW_CODE, NEW_CODE, 998, "BENCHMARKIA", "BENCH DOLLAR", "BNC", 998)), 1)
+        timings["delete_country"] += measure(lambda: _require(db.delete_country(NEW_CODE)), 1)
+    yield from timings.items()
+
+
+def bench_table_logic(db, repeat):
+    """Yield (name, durations) for the filter, sort and lookup work of the View and Edit tabs"""
+    if db.view_mode == "pushdown":
+        yield "view.count", measure(lambda: db.count_countries(SEARCH), repeat)
+        yield "view.page", measure(lambda: list(db.iter_countries_page(SEARCH, SORT_COLUMN, True, 50, 0)), repeat)
+    else:
+        table = db.get_country_table(refresh=True)
+        # The first search of a table builds its trigram index
+        yield "view.search.first", measure(lambda: table.search("country", SEARCH), 1)
+        yield "view.search", measure(lambda: table.search("country", SEARCH), repeat)
+        yield "view.search.short", measure(lambda: table.search("country", SHORT_SEARCH), repeat)
+        # The first sort by a column computes the order that later sorts reuse
+        yield "view.sort.first", measure(lambda: table.sorted(SORT_COLUMN), 1)
+        yield "view.sort", measure(lambda: table.sorted(SORT_COLUMN, ascending=False), repeat)
+        positions = table.search_positions("country", SEARCH)
+        yield "view.search_sort", measure(lambda: table.sorted(SORT_COLUMN, True, positions), repeat)
+
+    table = db.get_country_table()
+    country = table.values("country")[len(table) // 2]
+    yield "edit.options", measure(lambda: table.values("country"), repeat)
+    yield "edit.lookup", measure(lambda: table.get("country", country), repeat)
+
+
+def _render(db_manager):
+    # Run by streamlit.testing as a script, so it imports what it needs itself
+    from src.ui import CountryCurrencyUI
+    CountryCurrencyUI(db_manager).render()
+
+
+def bench_ui(db, repeat):
+    """Yield (name, durations, tab spans) for headless runs of the whole page"""
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # The page's own widget warnings would drown out the results
+    set_log_level("error")
+
+    def scenario(name, run):
+        metrics.reset()
+        durations = measure(run, repeat)
+        spans = {row["span"]: row["p50_ms"] for row in metrics.summary() if row["span"].startswith("ui.")}
+        return name, durations, spans
+
+    apps = []
+
+    def first_run():
+        apps.append(_rendered(AppTest.from_function(_render, args=(db,), default_timeout=600).run()))
+    yield scenario("ui.first_run", first_run)
+
+    app = apps[-1]
+    searches = iter([SEARCH, SHORT_SEARCH] * repeat)
+    yield scenario("ui.search", lambda: _rendered(app.text_input(key="view_country_filter").input(next(searches)).run()))
+
+    column = next(box for box in app.selectbox if box.label == "Column")
+    columns = iter([SORT_COLUMN, "country"] * repeat)
+    yield scenario("ui.sort", lambda: _rendered(column.set_value(next(columns)).run()))
+
+
+def summarize(name, rows, mode, durations, **extra):
+    milliseconds = [seconds * 1000 for seconds in durations]
+    return {
+        "name": name,
+        "rows": rows,
+        "mode": mode,
+        "runs": len(milliseconds),
+        "p50_ms": round(statistics.median(milliseconds), 3),
+        "mean_ms": round(statistics.fmean(milliseconds), 3),
+        "min_ms": round(min(milliseconds), 3),
+        "max_ms": round(max(milliseconds), 3),
+        **extra,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous, threshold):
+    """Print p50 ratios against a previous results file and return the regressions"""
+    before = {(r["name"], r["rows"], r["mode"]): r for r in previous["results"]}
+    regressions = []
+    print(f"\nCompared with {previous.get('commit') or 'previous run'}:")
+    for result in results:
+        old = before.get((result["name"], result["rows"], result["mode"]))
+        if not old or not old["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / old["p50_ms"]
+        flag = " REGRESSION" if ratio > threshold and result["p50_ms"] >= NOISE_FLOOR_MS else ""
+        if flag:
+            regressions.append(result)
+        print(f"{result['rows']:>9} {result['mode']:<9} {result['name']:<24} "
+              f"{old['p50_ms']:>10.2f} -> {result['p50_ms']:>10.2f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app against a local DuckDB stand-in for the warehouse")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="table sizes to generate")
+    parser.add_argument("--modes", nargs="+", default=list(DatabaseManager.VIEW_MODES), choices=DatabaseManager.VIEW_MODES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per benchmark")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency of each round trip")
+    parser.add_argument("--connect-ms", type=float, default=0.0, help="simulated latency of opening a connection")
+    parser.add_argument("--skip-ui", action="store_true", help="skip the headless Streamlit runs")
+    parser.add_argument("--output", default="benchmark-results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="a previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="p50 slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = []
+    for rows in args.rows:
+        sql = FakeSql(latency_ms=args.latency_ms, connect_ms=args.connect_ms)
+        sql.load(synthetic_countries(rows))
+        for mode in args.modes:
+            db = DatabaseManager(connector=sql, cfg=FakeConfig(), view_mode=mode)
+            suites = [bench_data_layer(db, args.repeat), bench_table_logic(db, args.repeat)]
+            if not args.skip_ui:
+                suites.append(bench_ui(db, args.repeat))
+            for suite in suites:
+                for name, durations, *spans in suite:
+                    result = summarize(name, rows, mode, durations, **({"spans_p50_ms": spans[0]} if spans else {}))
+                    results.append(result)
+                    print(f"{rows:>9} {mode:<9} {name:<24} p50 {result['p50_ms']:>10.2f} ms")
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as previous:
+            if compare(results, json.load(previous), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
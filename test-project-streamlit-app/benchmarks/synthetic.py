@@ -0,0 +1,52 @@
+# File: benchmarks/synthetic.py
+import numpy as np
+import pandas as pd
+
+LETTERS = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+SYLLABLES = np.array(["AN", "BO", "CA", "DI", "EL", "FU", "GA", "HI", "KO", "LA", "MI", "NU", "RA", "SE", "TO", "VIA"])
+# Distinct three-letter codes
+CODES = 26 ** 3
+# Distinct currencies, a few hundred like the real table, where a handful such as EUR and USD cover many countries
+CURRENCIES = 300
+
+
+def _codes(numbers):
+    """Encode numbers as three-letter codes"""
+    numbers = numbers % CODES
+    return np.char.add(np.char.add(LETTERS[numbers // 676], LETTERS[numbers // 26 % 26]), LETTERS[numbers % 26])
+
+
+def _names(numbers, rng):
+    """Build a country-like name for each number from three syllables"""
+    picks = rng.integers(0, len(SYLLABLES), size=(CODES, 3))[numbers % CODES]
+    return np.char.add(np.char.add(SYLLABLES[picks[:, 0]], SYLLABLES[picks[:, 1]]), SYLLABLES[picks[:, 2]])
+
+
+def synthetic_countries(rows, seed=0):
+    """Return rows of country/currency data shaped like the real table.
+
+    Country codes are unique for the first 17,576 rows. Beyond that, codes
+    repeat with another currency each time, the way a few real countries use
+    several currencies, so (country_code, country, currency_code) stays
+    unique up to 300 times that many rows. Currencies come from a pool of
+    300 with a skewed share of countries each, so currency codes repeat
+    as heavily as in the real table. The same rows and seed always give the
+    same table.
+    """
+    rng = np.random.default_rng(seed)
+    numbers = np.arange(rows)
+    country_numbers = numbers % CODES
+    pool = rng.choice(CODES, size=CURRENCIES, replace=False)
+    # Zipf-like shares: the first currency of the pool is used by the most countries
+    shares = 1 / np.arange(1, CURRENCIES + 1)
+    first_currency = rng.choice(CURRENCIES, size=CODES, p=shares / shares.sum())
+    # Each repeat of a country code moves on to the next currency of the pool
+    currency_numbers = pool[(first_currency[country_numbers] + numbers // CODES) % CURRENCIES]
+    return pd.DataFrame({
+        "country_code": _codes(country_numbers),
+        "country_number": (country_numbers % 1000).astype("int32"),
+        "country": _names(country_numbers, rng),
+        "currency_name": np.char.add(_names(currency_numbers, rng), " DOLLAR"),
+        "currency_code": _codes(currency_numbers),
+        "currency_number": (currency_numbers % 1000).astype("int32"),
+    })
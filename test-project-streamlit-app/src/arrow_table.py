@@ -0,0 +1,144 @@
+# File: src/arrow_table.py
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.compact import compact_frame, widen_arrow
+from src.indexed_table import new_version, ordered_positions
+from src.search_index import REGEX_CHARS
+
+
+class ArrowTable:
+    """Read-only country table kept as a pyarrow.Table.
+
+    Offers the same reads and writes as IndexedTable, but filters, sorts and
+    looks up rows with pyarrow.compute, so only the rows a caller asks for are
+    converted to pandas. The table is expected in the form of
+    compact.compact_arrow.
+    """
+
+    def __init__(self, table, source_version=None):
+        self.table = table
+        self.version = new_version()
+        # Delta version of the warehouse table the rows were read at, if known
+        self.source_version = source_version
+        # Sort orders are computed on first sort by a column, and dropped with the table on writes
+        self._sort_orders = {}
+        # The whole-table DataFrame is converted on first use and shared like the table
+        self._frame = None
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @property
+    def frame(self):
+        """The whole table as a compact DataFrame, converted once per table"""
+        if self._frame is None:
+            self._frame = compact_frame(self.table.to_pandas())
+        return self._frame
+
+    def values(self, column):
+        """Return the values of column in row order"""
+        return self.table[column].to_pylist()
+
+    def to_arrow(self):
+        """Return the rows as an Arrow table"""
+        return self.table
+
+    def _mask(self, column, value):
+        return pc.fill_null(pc.equal(self.table[column], value), False)
+
+    def contains(self, column, value):
+        """Check whether any row has column equal to value"""
+        return pc.any(self._mask(column, value)).as_py()
+
+    def get(self, column, value):
+        """Return the first row whose column equals value, or None"""
+        position = pc.index(self.table[column], value).as_py()
+        if position < 0:
+            return None
+        return self.table.slice(position, 1).to_pandas().iloc[0]
+
+    def lookup(self, column, value):
+        """Return all rows whose column equals value"""
+        return self.table.filter(self._mask(column, value)).to_pandas()
+
+    def _matches(self, column, query):
+        if REGEX_CHARS.intersection(query):
+            return pc.match_substring_regex(self.table[column], query, ignore_case=True)
+        return pc.match_substring(self.table[column], query, ignore_case=True)
+
+    def search_positions(self, column, query):
+        """Return the positions of the rows whose column contains query, like str.contains(query, case=False)"""
+        return pc.indices_nonzero(self._matches(column, query)).to_numpy()
+
+    def search(self, column, query):
+        """Return an Arrow table of the rows whose column contains query, like str.contains(query, case=False)"""
+        return self.table.filter(self._matches(column, query))
+
+    def sorted(self, column, ascending=True, positions=None):
+        """Return an Arrow table of the rows, or only those at positions, sorted by column with nulls last.
+
+        Like IndexedTable.sorted, each column is sorted once per table and
+        both directions share that order.
+        """
+        return self.table.take(self._sorted_positions(column, ascending, positions))
+
+    def _sorted_positions(self, column, ascending, positions):
+        cached = self._sort_orders.get(column)
+        if cached is None:
+            # sort_indices places nulls at the end
+            order = pc.sort_indices(self.table[column]).to_numpy()
+            cached = self._sort_orders[column] = (order, self.table[column].null_count)
+        return ordered_positions(*cached, ascending, positions)
+
+    def sorted_batches(self, column, ascending=True, positions=None, batch_rows=10_000):
+        """Yield the rows of sorted() as Arrow tables of up to batch_rows rows, taking one batch at a time"""
+        order = self._sorted_positions(column, ascending, positions)
+        for start in range(0, max(len(order), 1), batch_rows):
+            yield self.table.take(order[start:start + batch_rows])
+
+    def _rows(self, rows):
+        """Build an Arrow table of rows, returned with this table widened to share its schema"""
+        frame = pd.DataFrame(list(rows), columns=self.table.column_names)
+        table = widen_arrow(self.table, frame)
+        # Form inputs arrive as strings, so cast to the column types first
+        frame = frame.astype({field.name: field.type.to_pandas_dtype() for field in table.schema})
+        return table, pa.Table.from_pandas(frame, schema=table.schema, preserve_index=False)
+
+    def apply_edits(self, updated=None, inserted=(), deleted=()):
+        """Return a copy of the table with edits applied by row position (the frame's labels)"""
+        updated = updated or {}
+        table, rows = self._rows(list(updated.values()) + list(inserted))
+        # Rows come from the table followed by the new rows: updated positions
+        # take their replacement, deleted ones are skipped and inserts go last
+        order = np.arange(table.num_rows + rows.num_rows)
+        order[list(updated)] = table.num_rows + np.arange(len(updated))
+        keep = np.ones(table.num_rows, dtype=bool)
+        keep[list(deleted)] = False
+        order = np.concatenate([order[:table.num_rows][keep], order[table.num_rows + len(updated):]])
+        return ArrowTable(pa.concat_tables([table, rows]).take(order), self.source_version)
+
+    # Like IndexedTable, writes mirror the SQL statements keyed by country_code
+
+    def _write_mask(self, country_code):
+        mask = self._mask("country_code", country_code)
+        if not pc.any(mask).as_py():
+            raise ValueError(f"Country code {country_code} is not loaded")
+        return mask
+
+    def insert(self, row):
+        """Return a copy of the table with row appended"""
+        return ArrowTable(pa.concat_tables(self._rows([row])), self.source_version)
+
+    def replace(self, original_country_code, row):
+        """Return a copy of the table with the rows keyed by original_country_code replaced"""
+        mask = self._write_mask(original_country_code)
+        table, replacement = self._rows([row])
+        columns = [pc.if_else(mask, replacement[name][0], table[name]) for name in table.column_names]
+        return ArrowTable(pa.Table.from_arrays(columns, schema=table.schema), self.source_version)
+
+    def delete(self, country_code):
+        """Return a copy of the table without the rows keyed by country_code"""
+        return ArrowTable(self.table.filter(pc.invert(self._write_mask(country_code))), self.source_version)
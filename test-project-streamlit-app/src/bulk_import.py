@@ -0,0 +1,113 @@
+# File: src/bulk_import.py
+import argparse
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from src.database import DatabaseManager
+from src.query_builder import COLUMNS, UPSERT_KEYS
+
+# Rows per MERGE statement; each row takes six parameter markers
+DEFAULT_BATCH_SIZE = 40
+# Rows read from the CSV at a time
+DEFAULT_CHUNK_SIZE = 5000
+# Validation messages kept in the report
+MAX_ERRORS = 20
+
+
+@dataclass
+class ImportReport:
+    """Counters and timings of a bulk import"""
+    rows_read: int = 0
+    rows_upserted: int = 0
+    rows_rejected: int = 0
+    errors: list = field(default_factory=list)
+    batch_timings: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_upserted / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"Upserted {self.rows_upserted} of {self.rows_read} rows "
+                f"in {len(self.batch_timings)} batches ({self.rows_per_second:.0f} rows/sec), "
+                f"{self.rows_rejected} rejected")
+
+
+def find_problems(rows):
+    """Return a Series with the validation problems of each row read as strings, "" if valid"""
+    problems = pd.Series("", index=rows.index)
+    for column in ("country_code", "currency_code"):
+        problems[~rows[column].str.fullmatch(r"[A-Za-z]{3}")] += f"{column} must be three letters; "
+    for column in ("country_number", "currency_number"):
+        problems[~rows[column].str.fullmatch(r"\d{1,9}")] += f"{column} must be a whole number; "
+    for column in ("country", "currency_name"):
+        problems[rows[column].str.strip() == ""] += f"{column} is required; "
+    return problems.str.rstrip("; ")
+
+
+def validate_rows(chunk):
+    """Split a chunk read as strings into typed valid rows and error messages"""
+    missing = [column for column in COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    chunk = chunk[COLUMNS]
+
+    problems = find_problems(chunk)
+    invalid = problems != ""
+    # +2 turns the zero-based row index into a file line number after the header
+    errors = [f"Line {index + 2}: {problem}" for index, problem in problems[invalid].items()]
+
+    valid = chunk[~invalid].astype({"country_number": int, "currency_number": int})
+    # One MERGE cannot match a target row against two source rows
+    valid = valid.drop_duplicates(subset=UPSERT_KEYS, keep="last")
+    return valid, errors
+
+
+def _batches(source, report, chunk_size, batch_size):
+    """Stream validated batches of rows from a CSV, recording rejects in report"""
+    for chunk in pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_size):
+        valid, errors = validate_rows(chunk)
+        report.rows_read += len(chunk)
+        report.rows_rejected += len(errors)
+        report.errors.extend(errors[:MAX_ERRORS - len(report.errors)])
+        for start in range(0, len(valid), batch_size):
+            yield valid.iloc[start:start + batch_size]
+
+
+def import_csv(db_manager, source, chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE, on_batch=None):
+    """Upsert the rows of a country currency CSV (path or file object) into the table"""
+    report = ImportReport()
+
+    def record(rows, seconds):
+        report.rows_upserted += rows
+        report.batch_timings.append((rows, seconds))
+        if on_batch:
+            on_batch(rows, seconds)
+
+    started = time.perf_counter()
+    db_manager.upsert_countries(_batches(source, report, chunk_size, batch_size), on_batch=record)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk upsert a country currency CSV into the warehouse table")
+    parser.add_argument("csv_path", help="CSV with the columns " + ", ".join(COLUMNS))
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows read from the CSV at a time")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per MERGE statement")
+    args = parser.parse_args(argv)
+
+    def print_batch(rows, seconds):
+        print(f"Batch of {rows} rows in {seconds * 1000:.1f} ms")
+
+    report = import_csv(DatabaseManager(), args.csv_path, args.chunk_size, args.batch_size, on_batch=print_batch)
+    for error in report.errors:
+        print(error)
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# File: src/cache.py
+import threading
+import time
+
+
+class _Flight:
+    """A load in progress that concurrent callers wait on"""
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedCache:
+    """Process-wide TTL cache with single-flight loading.
+
+    Concurrent callers that miss on the same key wait for one loader call
+    instead of each running their own. Every invalidation bumps the key's
+    generation, so a load that started before a write never overwrites the
+    cache with pre-write data.
+    """
+
+    def __init__(self, ttl_seconds=300.0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (value, loaded_at)
+        self._generations = {}
+        self._flights = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "waits": 0, "invalidations": 0, "patches": 0,
+                       "refreshes": 0}
+
+    def stats(self):
+        """Return a snapshot of cache counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def get(self, key, loader, submit=None):
+        """Return the cached value for key, calling loader() at most once per miss.
+
+        If ``submit`` (an executor's submit method) is given and the entry has
+        expired, the stale value is returned at once while loader() refreshes
+        it in the background.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[1] < self.ttl_seconds:
+                self._stats["hits"] += 1
+                return entry[0]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight(self._generations.get(key, 0))
+                self._flights[key] = flight
+            stale = entry is not None and submit is not None
+            self._stats["stale_hits" if stale else "misses" if leader else "waits"] += 1
+
+        if stale:
+            if leader:
+                try:
+                    submit(self._load, key, flight, loader)
+                except RuntimeError:
+                    # The executor is shutting down; load in the foreground instead
+                    return self._load(key, flight, loader)
+            return entry[0]
+        if leader:
+            return self._load(key, flight, loader)
+
+        flight.done.wait()
+        if flight.error:
+            raise flight.error
+        return flight.value
+
+    def refresh(self, key, loader, restart=False):
+        """Reload key now while its cached value keeps being served, joining a load already in flight.
+
+        With ``restart``, a load already in flight is superseded instead of
+        joined, since it may have read the data before a change the refresh
+        is meant to pick up.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if restart and flight is not None:
+                # The superseded load finishes, but no longer stores its value
+                self._generations[key] = self._generations.get(key, 0) + 1
+                flight = None
+            leader = flight is None
+            if leader:
+                flight = _Flight(self._generations.get(key, 0))
+                self._flights[key] = flight
+            self._stats["refreshes" if leader else "waits"] += 1
+
+        if leader:
+            return self._load(key, flight, loader)
+        flight.done.wait()
+        if flight.error:
+            raise flight.error
+        return flight.value
+
+    def _load(self, key, flight, loader):
+        """Run loader() for a flight and store its value unless the key was invalidated meanwhile"""
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                if self._generations.get(key, 0) == flight.generation:
+                    self._entries[key] = (flight.value, time.monotonic())
+            return flight.value
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def peek(self, key):
+        """Return the cached value for key however old it is, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def loading(self, key):
+        """Check whether a load of key is in flight"""
+        with self._lock:
+            return key in self._flights
+
+    def seed(self, key, loader):
+        """Store loader()'s value for a key that was never loaded, as if it had already expired.
+
+        The next get() with ``submit`` serves it at once while the real value
+        loads in the background. loader() may return None when it has nothing
+        to offer. Returns whether a value was stored.
+        """
+        with self._lock:
+            if key in self._entries or key in self._generations:
+                return False
+        value = loader()
+        with self._lock:
+            if value is None or key in self._entries or key in self._generations:
+                return False
+            self._entries[key] = (value, float("-inf"))
+            return True
+
+    def update(self, key, transform):
+        """Replace the cached value with transform(value).
+
+        The transform must return a new value rather than mutate the cached
+        one, since other sessions may be reading it. If nothing is cached,
+        the transform raises, or another write got in first, the entry is
+        invalidated instead and the next get() does a full reload.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generations.get(key, 0)
+
+        value = None
+        if entry is not None:
+            try:
+                value = transform(entry[0])
+            except Exception:
+                value = None
+
+        with self._lock:
+            if value is not None and self._generations.get(key, 0) == generation:
+                self._entries[key] = (value, entry[1])
+                self._flights.pop(key, None)
+                self._generations[key] = generation + 1
+                self._stats["patches"] += 1
+                return True
+        self.invalidate(key)
+        return False
+
+    def invalidate(self, key):
+        """Drop the cached value so the next get() reloads it"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._flights.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._stats["invalidations"] += 1
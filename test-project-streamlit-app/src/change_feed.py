@@ -0,0 +1,45 @@
+# File: src/change_feed.py
+from src.query_builder import COLUMNS, UPSERT_KEYS
+
+# Change types that add a row; "delete" and "update_preimage" remove one
+ADDITIONS = ("insert", "update_postimage")
+
+
+def net_changes(changes):
+    """Reduce change data feed rows to the final state of each key.
+
+    Returns a frame of the rows to upsert and a list of the key tuples to
+    delete. Within a commit removals sort before additions, so an update that
+    keeps its key ends as an upsert.
+    """
+    changes = changes.assign(_added=changes["_change_type"].isin(ADDITIONS))
+    changes = changes.sort_values(["_commit_version", "_added"], kind="stable")
+    final = changes.drop_duplicates(subset=UPSERT_KEYS, keep="last")
+    upserts = final[final["_added"]][COLUMNS]
+    deletes = list(final.loc[~final["_added"], UPSERT_KEYS].itertuples(index=False, name=None))
+    return upserts, deletes
+
+
+def apply_changes(table, changes):
+    """Return a copy of a country table with change data feed rows applied.
+
+    Rows are matched on UPSERT_KEYS, so a change the table already has, such
+    as one of the app's own writes that was patched into the cache, is
+    applied again without duplicating rows.
+    """
+    upserts, deletes = net_changes(changes)
+    frame = table.frame
+    labels = {}
+    for label, key in zip(frame.index, frame[UPSERT_KEYS].itertuples(index=False, name=None)):
+        labels.setdefault(key, []).append(label)
+
+    updated, inserted, deleted = {}, [], []
+    for row in upserts.to_dict("records"):
+        key = tuple(row[column] for column in UPSERT_KEYS)
+        if key in labels:
+            updated.update((label, row) for label in labels[key])
+        else:
+            inserted.append(row)
+    for key in deletes:
+        deleted.extend(labels.get(key, ()))
+    return table.apply_edits(updated, inserted, deleted)
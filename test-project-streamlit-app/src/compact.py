@@ -0,0 +1,133 @@
+# File: src/compact.py
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Columns with few distinct values (USD, EUR, ...) kept as pandas categoricals
+CATEGORY_COLUMNS = ("currency_name", "currency_code")
+# Numeric codes kept in the narrowest integer type that holds them
+INTEGER_COLUMNS = ("country_number", "currency_number")
+INTEGER_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def narrowest_integer(values):
+    """Return the smallest signed integer dtype holding every value in values"""
+    values = np.asarray(values)
+    if not len(values):
+        return np.dtype(np.int8)
+    low, high = values.min(), values.max()
+    for kind in INTEGER_TYPES:
+        info = np.iinfo(kind)
+        if info.min <= low and high <= info.max:
+            return np.dtype(kind)
+    raise OverflowError(f"Values between {low} and {high} do not fit in 64 bits")
+
+
+def _is_integer(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in "iu"
+
+
+def compact_frame(frame):
+    """Return frame with repeated strings as categoricals and integer codes narrowed.
+
+    Integer columns with nulls, which pandas holds as floats, are left as
+    they are.
+    """
+    columns = {}
+    for column in CATEGORY_COLUMNS:
+        if column in frame and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+            columns[column] = frame[column].astype("category")
+    for column in INTEGER_COLUMNS:
+        if column in frame and _is_integer(frame[column].dtype):
+            columns[column] = frame[column].astype(narrowest_integer(frame[column].to_numpy()))
+    return frame.assign(**columns) if columns else frame
+
+
+def compact_arrow(table):
+    """Return an Arrow table with dictionary columns decoded and integer codes narrowed.
+
+    Unlike pandas, pyarrow.compute cannot search or sort dictionary arrays,
+    and Arrow strings carry no per-value object, so strings stay plain.
+    """
+    for position, field in enumerate(table.schema):
+        column = table.column(position)
+        if pa.types.is_dictionary(field.type):
+            column = column.cast(field.type.value_type)
+        elif field.name in INTEGER_COLUMNS and pa.types.is_integer(field.type) and not column.null_count:
+            bounds = pc.min_max(column)
+            values = [bounds["min"].as_py() or 0, bounds["max"].as_py() or 0]
+            column = column.cast(pa.from_numpy_dtype(narrowest_integer(values)))
+        else:
+            continue
+        table = table.set_column(position, field.name, column)
+    return table
+
+
+def widen_arrow(table, frame):
+    """Return an Arrow table with its integer codes widened, if needed, to hold those of frame too"""
+    for column in INTEGER_COLUMNS:
+        if column not in frame or not len(frame) or column not in table.column_names:
+            continue
+        position = table.schema.get_field_index(column)
+        kind = table.schema.field(position).type
+        if not pa.types.is_integer(kind):
+            continue
+        needed = narrowest_integer(frame[column].astype(np.int64).to_numpy())
+        wider = np.promote_types(kind.to_pandas_dtype(), needed)
+        if wider != kind.to_pandas_dtype():
+            table = table.set_column(position, column, table.column(position).cast(pa.from_numpy_dtype(wider)))
+    return table
+
+
+def conform(base, *frames):
+    """Cast frames of new rows to the dtypes of base, widening them where needed.
+
+    New strings are added to the categories of categorical columns, and an
+    integer column moves to a wider type if a new value does not fit, so
+    neither is lost or wrapped around. Returns base, which is a new frame if
+    a dtype changed, followed by the cast frames.
+    """
+    widened = {}
+    casts = base.dtypes.to_dict()
+    for column, dtype in base.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = pd.concat([frame[column] for frame in frames])
+            new = values[(dtype.categories.get_indexer(values) < 0) & values.notna()].unique()
+            if len(new):
+                # New categories go last, so the codes of existing rows still hold
+                casts[column] = pd.CategoricalDtype(dtype.categories.append(pd.Index(new)))
+                codes = base[column].cat.codes.to_numpy()
+                widened[column] = pd.Categorical.from_codes(codes, dtype=casts[column])
+        elif _is_integer(dtype):
+            values = np.concatenate([frame[column].astype(np.int64).to_numpy() for frame in frames])
+            wider = np.promote_types(dtype, narrowest_integer(values))
+            if wider != dtype:
+                widened[column] = base[column].astype(wider)
+                casts[column] = wider
+    if widened:
+        base = base.assign(**widened)
+    return (base, *(_cast(frame, casts) for frame in frames))
+
+
+def _cast(frame, dtypes):
+    """Cast frame to dtypes, encoding categoricals with the categories' cached hash table"""
+    columns = {}
+    for column, dtype in dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            codes = dtype.categories.get_indexer(frame[column])
+            columns[column] = pd.Categorical.from_codes(codes, dtype=dtype)
+        else:
+            columns[column] = frame[column].astype(dtype)
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def expand(frame):
+    """Return frame with categoricals as plain strings and integers as int64, so edits can hold any value"""
+    columns = {}
+    for column, dtype in frame.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            columns[column] = frame[column].astype(dtype.categories.dtype)
+        elif _is_integer(dtype) and dtype != np.int64:
+            columns[column] = frame[column].astype(np.int64)
+    return frame.assign(**columns) if columns else frame
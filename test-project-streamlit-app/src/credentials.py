@@ -0,0 +1,118 @@
+# File: src/credentials.py
+import base64
+import json
+import logging
+import os
+import threading
+import time
+
+from databricks.sdk.core import Config
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# How long headers without a readable expiry, such as a PAT's, are reused
+DEFAULT_TTL_SECONDS = float(os.getenv('DB_CREDENTIALS_TTL_SECONDS', '300'))
+# Headers are refreshed in the background this long before they expire
+REFRESH_AHEAD_SECONDS = float(os.getenv('DB_CREDENTIALS_REFRESH_AHEAD_SECONDS', '120'))
+# Background refreshes start at most this often, so a failing or unchanged token is not asked for on every request
+RETRY_SECONDS = 10.0
+
+
+def token_expiry(headers):
+    """Return the expiry (epoch seconds) of a bearer JWT in headers, or None if it has none"""
+    scheme, _, token = headers.get("Authorization", "").partition(" ")
+    parts = token.split(".")
+    if scheme.lower() != "bearer" or len(parts) != 3:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4))
+        return float(json.loads(payload)["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class CredentialsCache:
+    """Auth headers of one Config, shared by every connection in the process.
+
+    Headers are reused until shortly before they expire, then refreshed on
+    a background thread while the current ones keep being handed out. Only
+    once they have expired do callers wait, and then on a single refresh,
+    so concurrent sessions never stampede the token endpoint.
+    """
+
+    def __init__(self, cfg, ttl_seconds=DEFAULT_TTL_SECONDS, refresh_ahead_seconds=REFRESH_AHEAD_SECONDS):
+        self.cfg = cfg
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        # Held while refreshing, so callers with expired headers wait on one refresh
+        self._lock = threading.Lock()
+        # (headers, expires_at, refresh_at), replaced as a whole so readers need no lock
+        self._current = None
+        self._background_lock = threading.Lock()
+        self._refreshing = False
+        self._retry_at = 0.0
+
+    def headers(self):
+        """Return auth headers for a request, refreshing them if needed"""
+        current = self._current
+        now = time.time()
+        if current and now < current[1]:
+            if now >= current[2]:
+                self._refresh_in_background()
+            return current[0]
+        with self._lock:
+            # Another caller may have refreshed while this one waited
+            current = self._current
+            if current and time.time() < current[1]:
+                return current[0]
+            return self._refresh()[0]
+
+    def header_factory(self):
+        """Return the header factory expected by databricks.sql's credentials_provider"""
+        return self.headers
+
+    def _refresh(self):
+        """Resolve new headers from the Config and store them; the caller holds the lock"""
+        with metrics.span("credentials.refresh"):
+            headers = self.cfg.authenticate()
+        now = time.time()
+        # A token handed out as already expired, say through clock skew, is still tried for a while
+        expires_at = max(token_expiry(headers) or now + self.ttl_seconds, now + RETRY_SECONDS)
+        self._current = (headers, expires_at, expires_at - self.refresh_ahead_seconds)
+        return self._current
+
+    def _refresh_in_background(self):
+        """Start a background refresh unless one is running or was started moments ago"""
+        with self._background_lock:
+            if self._refreshing or time.time() < self._retry_at:
+                return
+            self._refreshing = True
+            self._retry_at = time.time() + RETRY_SECONDS
+        threading.Thread(target=self._background_refresh, name="credentials-refresh", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                self._refresh()
+        except Exception as e:
+            # The current headers stay in use until they expire
+            logger.warning("Could not refresh credentials ahead of expiry: %s", e)
+        finally:
+            with self._background_lock:
+                self._refreshing = False
+
+
+# The Config is resolved once per process, not once per DatabaseManager
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_credentials():
+    """Return the process-wide credentials cache, resolving the Config from the environment on first use"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = CredentialsCache(Config())
+        return _default
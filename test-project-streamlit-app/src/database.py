@@ -1,78 +1,570 @@
-# File: src/database.py
-import os
-from databricks import sql
-from databricks.sdk.core import Config
-import pandas as pd
-
-class DatabaseManager:
-    """Class to handle all database operations"""
-    
-    def __init__(self):
-        # Ensure environment variable is set correctly
-        assert os.getenv('DATABRICKS_WAREHOUSE_ID'), "DATABRICKS_WAREHOUSE_ID must be set in app.yaml."
-        self.cfg = Config()  # Pull environment variables for auth
-    
-    def query(self, query: str) -> pd.DataFrame:
-        """Execute a SQL query and return results as a DataFrame"""
-        with sql.connect(
-            server_hostname=self.cfg.host,
-            http_path=f"/sql/1.0/warehouses/{os.getenv('DATABRICKS_WAREHOUSE_ID')}",
-            credentials_provider=lambda: self.cfg.authenticate
-        ) as connection:
-            with connection.cursor() as cursor:
-                cursor.execute(query)
-                return cursor.fetchall_arrow().to_pandas()
-    
-    def execute(self, query: str, params=None) -> bool:
-        """Execute SQL statement with optional parameters."""
-        try:
-            with sql.connect(
-                server_hostname=self.cfg.host,
-                http_path=f"/sql/1.0/warehouses/{os.getenv('DATABRICKS_WAREHOUSE_ID')}",
-                credentials_provider=lambda: self.cfg.authenticate
-            ) as connection:
-                with connection.cursor() as cursor:
-                    if params:
-                        cursor.execute(query, params)
-                    else:
-                        cursor.execute(query)
-                    connection.commit()
-                    return True
-        except Exception as e:
-            print(f"Database error: {str(e)}")
-            return False
-    
-    def get_all_countries(self):
-        """Get all country data from the database"""
-        return self.query("select * from test_project.country_code_to_currency.country_currency_table")
-    
-    def add_country(self, country_code, country_number, country, currency_name, currency_code, currency_number):
-        """Add a new country to the database"""
-        query = """
-        INSERT INTO test_project.country_code_to_currency.country_currency_table 
-        (country_code, country_number, country, currency_name, currency_code, currency_number)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """
-        params = (country_code, country_number, country, currency_name, currency_code, currency_number)
-        return self.execute(query, params)
-    
-    def update_country(self, original_country_code, country_code, country_number, country, 
-                      currency_name, currency_code, currency_number):
-        """Update an existing country in the database"""
-        query = """
-        UPDATE test_project.country_code_to_currency.country_currency_table 
-        SET country_code = ?, country_number = ?, country = ?, 
-            currency_name = ?, currency_code = ?, currency_number = ?
-        WHERE country_code = ?
-        """
-        params = (country_code, country_number, country, currency_name, currency_code, currency_number, original_country_code)
-        return self.execute(query, params)
-    
-    def delete_country(self, country_code):
-        """Delete a country from the database"""
-        query = """
-        DELETE FROM test_project.country_code_to_currency.country_currency_table 
-        WHERE country_code = ?
-        """
-        params = (country_code,)
-        return self.execute(query, params)
+# File: src/database.py
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from databricks import sql
+import pandas as pd
+import pyarrow as pa
+from src.arrow_table import ArrowTable
+from src.cache import SharedCache
+from src.change_feed import apply_changes
+from src.compact import compact_arrow, compact_frame
+from src.credentials import CredentialsCache, default_credentials
+from src.export import EXPORT_BATCH_ROWS
+from src.indexed_table import IndexedTable
+from src.metrics import metrics
+from src.pool import ConnectionPool
+from src import query_builder
+from src import snapshot
+from src import statements
+
+logger = logging.getLogger(__name__)
+
+# Frames handed out share memory with the cached table, so writes to them must copy instead of
+# changing it for every session. Copy-on-write is always on from pandas 3 and opt-in before
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Pools are shared by every Streamlit session in the process, keyed by warehouse
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Table reads are cached once per process and shared by every session
+table_cache = SharedCache(ttl_seconds=float(os.getenv('COUNTRY_CACHE_TTL_SECONDS', '300')))
+
+# Table versions behind beyond which a full reload is done instead of reading the change feed
+MAX_CHANGE_VERSIONS = int(os.getenv('COUNTRY_MAX_CHANGE_VERSIONS', '50'))
+
+# Once reading the change feed fails, for example because it is not enabled on the table,
+# reloads go straight to a full read for this long before the feed is tried again
+CHANGE_FEED_RETRY_SECONDS = float(os.getenv('COUNTRY_CHANGE_FEED_RETRY_SECONDS', '3600'))
+_change_feed_failures = {}  # pool key -> when reading its change feed last failed
+_change_feed_lock = threading.Lock()
+
+# Incremental syncs rewrite the snapshot only once it is this many table versions behind. A new
+# process catches up from an older snapshot through the change feed, so it only has to stay well
+# within MAX_CHANGE_VERSIONS
+SNAPSHOT_EVERY_VERSIONS = int(os.getenv('COUNTRY_SNAPSHOT_EVERY_VERSIONS', '10'))
+_snapshot_versions = {}  # snapshot path -> table version of the last snapshot written
+_snapshot_lock = threading.Lock()
+
+# Reads issued during a session's Streamlit run are cancelled after this long, since nobody waits longer for a page
+INTERACTIVE_TIMEOUT_SECONDS = float(os.getenv('DB_INTERACTIVE_TIMEOUT_SECONDS', '30'))
+
+# Statements of every session are tracked in one place, to cancel them past their deadline or once superseded
+statement_tracker = statements.StatementTracker()
+
+# Grid edit rows per MERGE; each row takes ten parameter markers, so a batch stays within the 240 of a bulk import batch
+EDIT_BATCH_ROWS = int(os.getenv('DB_EDIT_BATCH_ROWS', '24'))
+
+# Rows fetched per round trip when streaming results
+STREAM_BATCH_ROWS = int(os.getenv('DB_STREAM_BATCH_ROWS', '1000'))
+
+# Background queries of all sessions share one bounded set of worker threads
+executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('DB_EXECUTOR_WORKERS', '4')),
+    thread_name_prefix="database"
+)
+
+
+def get_pool(key, connect, connection_errors=()):
+    """Return the process-wide connection pool for a warehouse, creating it on first use"""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                connect,
+                size=int(os.getenv('DB_POOL_SIZE', '4')),
+                max_idle_seconds=float(os.getenv('DB_POOL_MAX_IDLE_SECONDS', '300')),
+                health_check_after=float(os.getenv('DB_POOL_HEALTH_CHECK_SECONDS', '30')),
+                connection_errors=connection_errors,
+            )
+        return _pools[key]
+
+
+def _pool_totals():
+    """Sum the statistics of every connection pool"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    totals = {}
+    for pool in pools:
+        for name, value in pool.stats().items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+metrics.register("pool", _pool_totals)
+metrics.register("cache", lambda: table_cache.stats())
+metrics.register("statements", lambda: statement_tracker.stats())
+
+
+class DatabaseManager:
+    """Class to handle all database operations"""
+    
+    COLUMNS = query_builder.COLUMNS
+    VIEW_MODES = ("memory", "pushdown", "arrow")
+    
+    def __init__(self, connector=None, cfg=None, view_mode=None, query_timeout=None):
+        # Ensure environment variable is set correctly
+        assert os.getenv('DATABRICKS_WAREHOUSE_ID'), "DATABRICKS_WAREHOUSE_ID must be set in app.yaml."
+        # Auth is resolved from environment variables once per process and its headers are shared
+        self.credentials = CredentialsCache(cfg) if cfg else default_credentials()
+        self.cfg = self.credentials.cfg
+        # Anything exposing databricks.sql's connect() can stand in for the warehouse
+        self.connector = connector or sql
+        self.http_path = f"/sql/1.0/warehouses/{os.getenv('DATABRICKS_WAREHOUSE_ID')}"
+        self.pool_key = (self.connector, self.cfg.host, self.http_path)
+        # The DB-API errors for a lost connection or session, as opposed to a failing statement
+        connection_errors = [getattr(self.connector, name, None) for name in ("OperationalError", "InterfaceError")]
+        self.pool = get_pool(self.pool_key, self._connect, [error for error in connection_errors if error])
+        # "memory" filters and sorts the cached pandas table, "arrow" keeps the cached
+        # table in Arrow and converts only what is shown, "pushdown" lets the warehouse do it
+        self.view_mode = view_mode or os.getenv('COUNTRY_VIEW_MODE', 'memory')
+        assert self.view_mode in self.VIEW_MODES, f"COUNTRY_VIEW_MODE must be one of {self.VIEW_MODES}."
+        self.table_kind = ArrowTable if self.view_mode == "arrow" else IndexedTable
+        self.cache_key = (self.pool_key, self.table_kind.__name__)
+        # Statements running longer than this are cancelled on the warehouse
+        self.query_timeout = query_timeout or float(os.getenv('DB_QUERY_TIMEOUT_SECONDS', '120'))
+        # The last loaded table is kept on disk so a new process can serve it at once;
+        # an empty COUNTRY_SNAPSHOT_DIR turns this off
+        snapshot_dir = os.getenv('COUNTRY_SNAPSHOT_DIR', snapshot.DEFAULT_DIR)
+        self.snapshot_path = snapshot.snapshot_path(snapshot_dir, self.cfg.host, self.http_path) if snapshot_dir else None
+    
+    def _connect(self):
+        """Open a new warehouse connection"""
+        with metrics.span("db.connect"):
+            return self.connector.connect(
+                server_hostname=self.cfg.host,
+                http_path=self.http_path,
+                credentials_provider=self.credentials.header_factory
+            )
+    
+    def pool_stats(self):
+        """Return hit/miss statistics of the shared connection pool"""
+        return self.pool.stats()
+    
+    def cache_stats(self):
+        """Return hit/miss statistics of the shared table cache"""
+        return table_cache.stats()
+    
+    def statement_stats(self):
+        """Return the number of statements in flight and of those cancelled, by reason"""
+        return statement_tracker.stats()
+    
+    def submit(self, method, *args, **kwargs):
+        """Run a DatabaseManager call on the shared background executor and return its Future.
+        
+        The call belongs to the caller's run, so a newer run cancels its reads too.
+        """
+        return executor.submit(contextvars.copy_context().run, method, *args, **kwargs)
+    
+    def begin_run(self, previous=None):
+        """Start a Streamlit run of a session and return it, cancelling the reads of its previous run.
+        
+        Reads issued from then on in this context, including calls passed to
+        submit, belong to the new run. Statements previous still has running
+        on the warehouse are cancelled there, and any it starts later fail
+        with StatementCancelled without being sent.
+        """
+        return statement_tracker.begin_run(previous)
+    
+    def _deadline(self, cursor, write=False):
+        """Track the cursor's statement while the block runs, cancelling it on the warehouse past its deadline.
+        
+        Reads of a session's run get the shorter interactive deadline and
+        are also cancelled once a newer run supersedes it. Writes, and reads
+        outside any run such as the shared table loads, only have the query
+        timeout.
+        """
+        run = None if write else statements.current_run()
+        timeout = min(self.query_timeout, INTERACTIVE_TIMEOUT_SECONDS) if run else self.query_timeout
+        return statement_tracker.track(cursor, timeout, run)
+    
+    def _execute(self, cursor, query, params=None):
+        """Execute a statement on cursor with optional parameters"""
+        with metrics.span("db.execute", statement=query.split(None, 1)[0].upper()):
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+    
+    def query_arrow(self, query: str, params=None, retries=1) -> pa.Table:
+        """Execute a SQL query and return results as an Arrow table, retried up to retries times on a lost connection"""
+        def run(connection):
+            with connection.cursor() as cursor, self._deadline(cursor):
+                self._execute(cursor, query, params)
+                with metrics.span("db.fetch") as span:
+                    result = cursor.fetchall_arrow()
+                    span.update(rows=result.num_rows, bytes=result.nbytes)
+                return result
+        return self.pool.run(run, retries)
+    
+    def iter_batches(self, query: str, params=None, batch_rows=STREAM_BATCH_ROWS, max_rows=None):
+        """Execute a SQL query and yield its results as Arrow tables of up to batch_rows rows.
+        
+        Only one batch is held at a time. With max_rows, reading stops once
+        that many rows were yielded; the rest of the result is never fetched.
+        The connection stays checked out until the generator is exhausted or
+        closed. The statement and each later fetch get a deadline of their
+        own, so time the caller spends on a batch, such as a slow download,
+        never counts against it.
+        """
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                remaining = max_rows
+                with self._deadline(cursor):
+                    self._execute(cursor, query, params)
+                    batch = self._fetch_batch(cursor, batch_rows, remaining)
+                while batch.num_rows:
+                    if remaining is not None:
+                        remaining -= batch.num_rows
+                    yield batch
+                    if remaining is not None and remaining <= 0:
+                        break
+                    with self._deadline(cursor):
+                        batch = self._fetch_batch(cursor, batch_rows, remaining)
+    
+    def _fetch_batch(self, cursor, batch_rows, remaining=None):
+        """Fetch up to batch_rows rows, and no more than remaining, from cursor as an Arrow table"""
+        with metrics.span("db.fetch_batch") as span:
+            batch = cursor.fetchmany_arrow(batch_rows if remaining is None else min(batch_rows, remaining))
+            span.update(rows=batch.num_rows, bytes=batch.nbytes)
+        return batch
+    
+    def query(self, query: str, params=None, retries=1) -> pd.DataFrame:
+        """Execute a SQL query and return results as a DataFrame"""
+        result = self.query_arrow(query, params, retries)
+        with metrics.span("db.to_pandas", rows=result.num_rows):
+            return result.to_pandas()
+    
+    def execute(self, query: str, params=None) -> bool:
+        """Execute SQL statement with optional parameters.
+        
+        The statement runs at most once: it may have been applied even if the
+        connection was lost before the result came back, so it is never retried.
+        """
+        def run(connection):
+            with connection.cursor() as cursor, self._deadline(cursor, write=True):
+                self._execute(cursor, query, params)
+                connection.commit()
+                return True
+        try:
+            return self.pool.run(run, retries=0)
+        except Exception as e:
+            logger.error("Database error: %s", e)
+            return False
+    
+    @metrics.timed("table.get")
+    def get_country_table(self, refresh=False):
+        """Get the country table (an IndexedTable, or an ArrowTable in arrow mode), served from the shared cache when fresh"""
+        if refresh:
+            self.invalidate_cache()
+        elif self.snapshot_path:
+            # Until the first load of this process finishes, serve the on-disk snapshot
+            table_cache.seed(self.cache_key, self._read_snapshot_table)
+        # Once loaded, an expired table is served while it reloads in the background
+        return table_cache.get(self.cache_key, self._load_country_table, submit=executor.submit)
+    
+    def refresh_country_table(self, restart=False):
+        """Bring the shared country table up to date now, and return it; sessions keep the old copy meanwhile.
+        
+        Only the changed rows are read when the change data feed allows it.
+        With restart, a load already in flight is superseded rather than
+        joined, as it may predate the change to pick up.
+        """
+        return table_cache.refresh(self.cache_key, self._load_country_table, restart)
+    
+    def refresh_in_background(self):
+        """Start bringing the shared country table up to date on the executor, and return the Future.
+        
+        Sessions keep being served the cached copy until the refresh is done.
+        Other table kinds cached for this warehouse are invalidated, and
+        nothing is loaded if this kind was never cached.
+        """
+        for key in self._cache_keys():
+            if key != self.cache_key:
+                table_cache.invalidate(key)
+        if table_cache.peek(self.cache_key) is None:
+            return None
+        return self.submit(self.refresh_country_table, True)
+    
+    def prefetch_countries(self):
+        """Start loading the country table in the background and return the Future"""
+        return self.submit(self.get_country_table)
+    
+    def is_refreshing(self):
+        """Check whether the shared country table is being reloaded"""
+        return table_cache.loading(self.cache_key)
+    
+    def get_all_countries(self, refresh=False) -> pd.DataFrame:
+        """Get all country data from the database.
+        
+        The frame is a shallow copy of the one shared by every session, so it
+        costs no memory per caller. Copy-on-write, enabled for the process
+        above, makes writes to it copy the columns they touch instead of
+        changing the shared table.
+        """
+        return self.get_country_table(refresh).frame.copy(deep=False)
+    
+    def get_table_version(self):
+        """Get the current Delta version of the country table"""
+        return int(self.query(query_builder.build_version_query())["version"].iloc[0])
+    
+    def _as_table_kind(self, data, version=None):
+        """Wrap an Arrow table of country rows, compacted, in the table kind of the view mode"""
+        data = compact_arrow(data)
+        if self.table_kind is ArrowTable:
+            return ArrowTable(data, source_version=version)
+        with metrics.span("db.to_pandas", rows=data.num_rows):
+            frame = compact_frame(data.to_pandas())
+        return IndexedTable(frame, source_version=version)
+    
+    def _load_country_table(self):
+        """Bring the country table up to date, reading only the changed rows when possible"""
+        # The load is shared by every session waiting on it, so no session's rerun may cancel it
+        with statements.unscoped():
+            return self._update_country_table()
+    
+    def _update_country_table(self):
+        # The version is read first, so the rows are at least as new as the version recorded
+        try:
+            version = self.get_table_version()
+        except Exception as e:
+            logger.warning("Could not read table version: %s", e)
+            version = None
+        cached = table_cache.peek(self.cache_key)
+        if version is not None and cached is not None and cached.source_version is not None:
+            if version == cached.source_version:
+                return cached
+            if 0 < version - cached.source_version <= MAX_CHANGE_VERSIONS and self._change_feed_available():
+                try:
+                    return self._sync_country_table(cached, version)
+                except Exception as e:
+                    logger.warning("Could not read table changes, reloading: %s", e)
+                    with _change_feed_lock:
+                        _change_feed_failures[self.pool_key] = time.monotonic()
+        return self._reload_country_table(version)
+    
+    def _change_feed_available(self):
+        """Check whether the table's change data feed is worth reading, as it did not fail within CHANGE_FEED_RETRY_SECONDS"""
+        with _change_feed_lock:
+            failed_at = _change_feed_failures.get(self.pool_key)
+        return failed_at is None or time.monotonic() - failed_at >= CHANGE_FEED_RETRY_SECONDS
+    
+    @metrics.timed("table.sync")
+    def _sync_country_table(self, table, version):
+        """Return a copy of table with the change data feed applied up to version"""
+        # A table without the feed fails the same way on every connection, so the read is not retried
+        changes = self.query(query_builder.build_changes_query(table.source_version + 1, version), retries=0)
+        synced = apply_changes(table, changes)
+        # The copy is not shared yet, so it can still be stamped with the version it caught up to
+        synced.source_version = version
+        if self._snapshot_due(version):
+            try:
+                # Converting and writing the whole table is left to a worker, off the load sessions wait on
+                executor.submit(self._save_table_snapshot, synced, version)
+            except RuntimeError:
+                # The executor is shutting down; the snapshot stays a few versions behind
+                pass
+        return synced
+    
+    @metrics.timed("table.reload")
+    def _reload_country_table(self, version=None):
+        """Load all country data, read at table version or later, into the table kind of the view mode"""
+        data = self.query_arrow("select * from test_project.country_code_to_currency.country_currency_table")
+        self._save_snapshot(data, version)
+        return self._as_table_kind(data, version)
+    
+    def _save_snapshot(self, data, version):
+        """Write the on-disk snapshot, if enabled"""
+        if not self.snapshot_path:
+            return
+        with _snapshot_lock:
+            _snapshot_versions[self.snapshot_path] = version
+        try:
+            snapshot.write_snapshot(self.snapshot_path, data, version)
+        except OSError as e:
+            logger.warning("Could not save table snapshot: %s", e)
+    
+    def _save_table_snapshot(self, table, version):
+        """Write a cached table to the on-disk snapshot"""
+        with metrics.span("table.snapshot", rows=len(table)):
+            self._save_snapshot(table.to_arrow(), version)
+    
+    def _snapshot_due(self, version):
+        """Check whether the snapshot is SNAPSHOT_EVERY_VERSIONS behind version, claiming the write if so"""
+        if not self.snapshot_path:
+            return False
+        with _snapshot_lock:
+            saved = _snapshot_versions.get(self.snapshot_path)
+            if saved is not None and version - saved < SNAPSHOT_EVERY_VERSIONS:
+                return False
+            _snapshot_versions[self.snapshot_path] = version
+            return True
+    
+    def _read_snapshot_table(self):
+        """Read the on-disk snapshot as the table kind of the view mode, or None if there is none"""
+        saved = snapshot.read_snapshot(self.snapshot_path)
+        if not saved:
+            return None
+        with _snapshot_lock:
+            _snapshot_versions.setdefault(self.snapshot_path, saved.table_version)
+        return self._as_table_kind(saved.table, saved.table_version)
+    
+    def count_countries(self, search=""):
+        """Count the countries whose name contains search, case-insensitively"""
+        query, params = query_builder.build_count_query(search)
+        return int(self.query(query, params)["row_count"].iloc[0])
+    
+    def get_countries_page(self, search="", sort_column="country", ascending=True, limit=50, offset=0):
+        """Get one sorted page of the countries whose name contains search"""
+        query, params = query_builder.build_page_query(search, sort_column, ascending, limit, offset)
+        return self.query(query, params)
+    
+    def iter_countries_page(self, search="", sort_column="country", ascending=True, limit=50, offset=0):
+        """Stream one sorted page of the countries whose name contains search as Arrow batches"""
+        query, params = query_builder.build_page_query(search, sort_column, ascending, limit, offset)
+        return self.iter_batches(query, params, max_rows=limit)
+    
+    def iter_export(self, search="", sort_column="country", ascending=True, batch_rows=EXPORT_BATCH_ROWS):
+        """Stream every row the View tab shows for search and sort, across all pages, as Arrow batches.
+        
+        In pushdown mode the rows are read from the warehouse cursor batch by
+        batch; otherwise they are taken from the cached table in sort order,
+        converting one batch at a time.
+        """
+        if self.view_mode == "pushdown":
+            query, params = query_builder.build_sorted_query(search, sort_column, ascending)
+            return self.iter_batches(query, params, batch_rows)
+        table = self.get_country_table()
+        positions = table.search_positions("country", search) if search else None
+        return table.sorted_batches(sort_column, ascending, positions, batch_rows)
+    
+    def upsert_countries(self, batches, on_batch=None):
+        """Upsert batches of rows, one MERGE per batch, on a single connection.
+        
+        ``batches`` is an iterable of DataFrames with the table's columns and
+        ``on_batch(rows, seconds)`` is called after each batch. Returns the
+        list of (rows, seconds) timings. Since any number of rows may have
+        changed, the shared table is then refreshed in the background, while
+        sessions keep reading the copy from before the upsert.
+        """
+        timings = []
+        try:
+            with self.pool.connection() as connection:
+                with connection.cursor() as cursor:
+                    for batch in batches:
+                        query = query_builder.build_upsert_query(len(batch))
+                        params = [value for row in batch[self.COLUMNS].astype(object).values.tolist() for value in row]
+                        started = time.perf_counter()
+                        with self._deadline(cursor, write=True):
+                            self._execute(cursor, query, params)
+                        timings.append((len(batch), time.perf_counter() - started))
+                        if on_batch:
+                            on_batch(*timings[-1])
+                connection.commit()
+        finally:
+            if timings:
+                self.refresh_in_background()
+        return timings
+    
+    def save_edits(self, edits, batch_rows=EDIT_BATCH_ROWS):
+        """Commit grid edits (see grid_edit.GridEdits) as MERGEs of up to batch_rows rows and patch them into the shared cache.
+        
+        The batches run on a single connection, and the cache is patched
+        only once all of them succeeded. If one fails, the batches before it
+        stay applied, so the cache is invalidated instead.
+        """
+        rows = edits.statement_rows()
+        applied = 0
+        try:
+            with self.pool.connection() as connection:
+                with connection.cursor() as cursor:
+                    for start in range(0, len(rows), batch_rows):
+                        batch = rows[start:start + batch_rows]
+                        query = query_builder.build_edit_query(len(batch))
+                        params = [value for row in batch for value in row]
+                        with self._deadline(cursor, write=True):
+                            self._execute(cursor, query, params)
+                        applied += 1
+                connection.commit()
+        except Exception as e:
+            logger.error("Database error: %s", e)
+            if applied:
+                self.invalidate_cache()
+            return False
+        
+        def patch(table):
+            # Edits are keyed by row label, which only holds for the table they were made on
+            if table.version != edits.base_version:
+                raise ValueError("The table changed while it was being edited")
+            return table.apply_edits(edits.updated, edits.inserted, edits.deleted)
+        
+        self._patch_cache(patch)
+        return True
+    
+    def _cache_keys(self):
+        """Return the cache keys of every table kind loaded from this warehouse"""
+        return [(self.pool_key, kind.__name__) for kind in (IndexedTable, ArrowTable)]
+    
+    def invalidate_cache(self):
+        """Force the next get_all_countries call to reload from the database"""
+        for key in self._cache_keys():
+            table_cache.invalidate(key)
+    
+    def execute_write(self, query: str, params=None, patch=None) -> bool:
+        """Execute a statement that modifies the table and apply it to the shared cache.
+        
+        On success the committed change is applied to the cached frame with
+        ``patch``, a function taking and returning a cached table, instead
+        of reloading the table. Without a patch, or if the
+        cached frame does not match what the patch expects, the cache is
+        invalidated and the next read does a full reload.
+        """
+        success = self.execute(query, params)
+        if success:
+            if patch:
+                self._patch_cache(patch)
+            else:
+                self.invalidate_cache()
+        return success
+    
+    def _patch_cache(self, patch):
+        """Apply a committed change to every cached copy of the table, or invalidate the ones it does not fit"""
+        # Both table kinds implement the same writes, so each cached copy is patched
+        for key in self._cache_keys():
+            table_cache.update(key, patch)
+    
+    def add_country(self, country_code, country_number, country, currency_name, currency_code, currency_number):
+        """Add a new country to the database"""
+        query = """
+        INSERT INTO test_project.country_code_to_currency.country_currency_table 
+        (country_code, country_number, country, currency_name, currency_code, currency_number)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        params = (country_code, country_number, country, currency_name, currency_code, currency_number)
+        return self.execute_write(query, params, lambda table: table.insert(dict(zip(self.COLUMNS, params))))
+    
+    def update_country(self, original_country_code, country_code, country_number, country, 
+                      currency_name, currency_code, currency_number):
+        """Update an existing country in the database"""
+        query = """
+        UPDATE test_project.country_code_to_currency.country_currency_table 
+        SET country_code = ?, country_number = ?, country = ?, 
+            currency_name = ?, currency_code = ?, currency_number = ?
+        WHERE country_code = ?
+        """
+        params = (country_code, country_number, country, currency_name, currency_code, currency_number, original_country_code)
+        row = dict(zip(self.COLUMNS, params))
+        return self.execute_write(query, params, lambda table: table.replace(original_country_code, row))
+    
+    def delete_country(self, country_code):
+        """Delete a country from the database"""
+        query = """
+        DELETE FROM test_project.country_code_to_currency.country_currency_table 
+        WHERE country_code = ?
+        """
+        params = (country_code,)
+        return self.execute_write(query, params, lambda table: table.delete(country_code))
@@ -0,0 +1,99 @@
+# File: src/export.py
+import os
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+# Rows read, converted and written per step of an export; memory use grows with this, not with the export
+EXPORT_BATCH_ROWS = int(os.getenv('EXPORT_BATCH_ROWS', '10000'))
+
+# File extension -> (label shown in the UI, MIME type)
+FORMATS = {
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+    "arrow": ("Arrow IPC", "application/vnd.apache.arrow.file"),
+}
+
+
+class _Chunks:
+    """Write-only file object collecting what a writer writes until it is drained"""
+
+    closed = False
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def drain(self):
+        """Return and forget everything written since the last drain"""
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _plain(batch):
+    """Return batch as a Table with dictionary columns decoded, so every batch shares one plain schema"""
+    table = pa.Table.from_batches([batch]) if isinstance(batch, pa.RecordBatch) else batch
+    for position, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(position, field.name, table.column(position).cast(field.type.value_type))
+    return table
+
+
+def _open(file_format, sink, schema):
+    if file_format == "csv":
+        return pa_csv.CSVWriter(sink, schema)
+    if file_format == "parquet":
+        return pq.ParquetWriter(sink, schema)
+    if file_format == "arrow":
+        return pa.ipc.new_file(sink, schema)
+    raise ValueError(f"Cannot export to unknown format {file_format!r}")
+
+
+def stream(batches, file_format, columns=()):
+    """Encode Arrow batches or tables in file_format and yield the file as chunks of bytes.
+
+    Each batch is written and handed out before the next is read, so only
+    one batch and its encoded bytes are held at a time. Without any batches,
+    a file with no rows and string columns named after columns is produced.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Cannot export to unknown format {file_format!r}")
+    sink = _Chunks()
+    writer = None
+    for batch in batches:
+        table = _plain(batch)
+        if writer is None:
+            writer = _open(file_format, sink, table.schema)
+        writer.write_table(table)
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is None:
+        writer = _open(file_format, sink, pa.schema([(column, pa.string()) for column in columns]))
+    writer.close()
+    yield sink.drain()
+
+
+def write(batches, file_format, output, columns=()):
+    """Write Arrow batches or tables to the binary file object output in file_format; returns the bytes written"""
+    written = 0
+    for data in stream(batches, file_format, columns):
+        output.write(data)
+        written += len(data)
+    return written
@@ -0,0 +1,86 @@
+# File: src/grid_edit.py
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from src.bulk_import import find_problems
+from src.query_builder import COLUMNS, UPSERT_KEYS
+
+NUMBER_COLUMNS = ["country_number", "currency_number"]
+
+
+@dataclass
+class GridEdits:
+    """Row changes between a loaded IndexedTable and an edited copy of its frame"""
+    base_version: int
+    updated: dict = field(default_factory=dict)  # label -> new row
+    inserted: list = field(default_factory=list)  # new rows
+    deleted: list = field(default_factory=list)  # labels
+    original_keys: dict = field(default_factory=dict)  # label -> original UPSERT_KEYS values
+    errors: list = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.updated or self.inserted or self.deleted)
+
+    def summary(self):
+        return (f"{len(self.updated)} updated, {len(self.inserted)} added "
+                f"and {len(self.deleted)} deleted rows")
+
+    def statement_rows(self):
+        """Return the parameter rows of query_builder.build_edit_query.
+
+        Deletes come first, then updates, then inserts. When the rows are
+        split across several MERGEs, a key freed by a delete is thus gone
+        before an update or insert takes it, and a deleted key never matches
+        a row inserted by an earlier batch.
+        """
+        no_key = [None] * len(UPSERT_KEYS)
+        no_values = [None] * len(COLUMNS)
+        rows = [["delete"] + self.original_keys[label] + no_values for label in self.deleted]
+        rows += [["update"] + self.original_keys[label] + [row[c] for c in COLUMNS]
+                 for label, row in self.updated.items()]
+        rows += [["insert"] + no_key + [row[c] for c in COLUMNS] for row in self.inserted]
+        return rows
+
+
+def _as_strings(rows):
+    """Render edited cells as strings so they can be validated like CSV input"""
+    strings = rows.astype(object).where(rows.notna(), "").astype(str)
+    for column in NUMBER_COLUMNS:
+        # Blank cells turn integer columns into floats in the editor
+        strings[column] = strings[column].str.replace(r"\.0$", "", regex=True)
+    return strings
+
+
+def _records(rows):
+    """Convert rows to dicts of plain Python values"""
+    return rows.astype(object).to_dict("records")
+
+
+def diff_table(table, edited):
+    """Compute the edits that turn table.frame into edited, matching rows by label"""
+    original = table.frame
+    edited = edited[COLUMNS]
+    edits = GridEdits(base_version=table.version)
+
+    is_new = ~edited.index.isin(original.index)
+    common = edited.index[~is_new]
+    before = original.loc[common, COLUMNS]
+    after = edited.loc[common]
+    changed = ((before != after) & ~(before.isna() & after.isna())).any(axis=1)
+
+    candidates = pd.concat([after[changed], edited[is_new]])
+    problems = find_problems(_as_strings(candidates))
+    edits.errors = [f"Row {label}: {problem}" for label, problem in problems[problems != ""].items()]
+    if edits.errors:
+        return edits
+
+    candidates = candidates.astype({column: int for column in NUMBER_COLUMNS})
+    updated = candidates.iloc[:int(changed.sum())]
+    edits.updated = dict(zip(updated.index, _records(updated)))
+    edits.inserted = _records(candidates.iloc[len(updated):])
+    edits.deleted = original.index.difference(edited.index).tolist()
+
+    keyed = list(edits.updated) + edits.deleted
+    edits.original_keys = dict(zip(keyed, original.loc[keyed, UPSERT_KEYS].astype(object).values.tolist()))
+    return edits
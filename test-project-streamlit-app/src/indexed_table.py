@@ -0,0 +1,223 @@
+# File: src/indexed_table.py
+import itertools
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from src.compact import conform
+from src.search_index import NgramIndex
+
+
+def _build_index(frame, column):
+    """Map each non-null value of column to the tuple of row labels holding it"""
+    index = {}
+    for label, value in zip(frame.index.tolist(), frame[column].tolist()):
+        if not pd.isna(value):
+            index.setdefault(value, []).append(label)
+    # Labels are collected in lists, since growing a tuple per row is quadratic in rows per value
+    return {value: tuple(labels) for value, labels in index.items()}
+
+
+def ordered_positions(order, null_count, ascending=True, positions=None):
+    """Return row positions in sort order, given the ascending order with nulls last.
+
+    Descending order reverses the non-null part, so nulls stay last either
+    way. With positions, only those rows are kept, still in sort order.
+    """
+    if not ascending:
+        valid = len(order) - null_count
+        order = np.concatenate([order[:valid][::-1], order[valid:]])
+    if positions is not None:
+        keep = np.zeros(len(order), dtype=bool)
+        keep[positions] = True
+        order = order[keep[order]]
+    return order
+
+
+# Versions are unique within the process, so a reloaded table never reuses
+# the version of one whose row labels meant something else
+_versions = itertools.count(1)
+
+
+def new_version():
+    """Return a table version not used before in this process"""
+    return next(_versions)
+
+
+def _sort_keys(values):
+    """Return values, or for a categorical the alphabetical rank of each value's category"""
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    # Categories are in the order they were added, not alphabetical. Nulls have
+    # code -1, which picks the extra rank at the end before being masked out
+    ranks = np.append(values.cat.categories.argsort().argsort(), 0)
+    codes = values.cat.codes.to_numpy()
+    return pd.Series(ranks[codes], index=values.index).where(codes >= 0)
+
+
+class IndexedTable:
+    """Read-only country table with hash indexes on its lookup columns.
+
+    Instances are shared between sessions, so they are never modified in
+    place: insert, replace and delete return a new table whose indexes are
+    derived from this one by touching only the keys of the changed row.
+    The frame is expected in the compact form of compact.compact_frame.
+    """
+
+    INDEXED_COLUMNS = ("country_code", "country", "currency_code")
+
+    def __init__(self, frame, indexes=None, search_indexes=None, source_version=None):
+        self.frame = frame
+        self.version = new_version()
+        # Delta version of the warehouse table the rows were read at, if known
+        self.source_version = source_version
+        self._indexes = indexes if indexes is not None else {
+            column: _build_index(frame, column) for column in self.INDEXED_COLUMNS
+        }
+        # Substring indexes are built on first search of a column
+        self._search_indexes = search_indexes or {}
+        # Sort orders are computed on first sort by a column, and dropped with the table on writes
+        self._sort_orders = {}
+        # New rows get the next label, so labels always increase in frame order
+        self._next_label = frame.index.max() + 1 if len(frame) else 0
+
+    def __len__(self):
+        return len(self.frame)
+
+    def labels(self, column, value):
+        """Return the row labels whose column equals value"""
+        return self._indexes[column].get(value, ())
+
+    def contains(self, column, value):
+        """Check whether any row has column equal to value"""
+        return value in self._indexes[column]
+
+    def values(self, column):
+        """Return the values of column in row order"""
+        return self.frame[column].tolist()
+
+    def to_arrow(self):
+        """Return the rows as an Arrow table"""
+        return pa.Table.from_pandas(self.frame, preserve_index=False)
+
+    def get(self, column, value):
+        """Return the first row whose column equals value, or None"""
+        labels = self.labels(column, value)
+        return self.frame.loc[labels[0]] if labels else None
+
+    def lookup(self, column, value):
+        """Return all rows whose column equals value"""
+        return self.frame.loc[list(self.labels(column, value))]
+
+    def search_positions(self, column, query):
+        """Return the positions of the rows whose column contains query, like str.contains(query, case=False)"""
+        if not NgramIndex.can_answer(query):
+            return np.flatnonzero(self.frame[column].str.contains(query, case=False, na=False).to_numpy())
+        search_index = self._search_indexes.get(column)
+        if search_index is None:
+            search_index = self._search_indexes[column] = NgramIndex.build(self.frame, column)
+        return self.frame.index.get_indexer(search_index.search(query))
+
+    def search(self, column, query):
+        """Return the rows whose column contains query, like str.contains(query, case=False)"""
+        return self.frame.iloc[self.search_positions(column, query)]
+
+    def sorted(self, column, ascending=True, positions=None):
+        """Return the rows, or only those at positions, sorted by column with nulls last.
+
+        Each column is sorted once per table and both directions share that
+        order, so re-sorting or filtering a sorted view costs a take.
+        """
+        return self.frame.iloc[self._sorted_positions(column, ascending, positions)]
+
+    def _sorted_positions(self, column, ascending, positions):
+        cached = self._sort_orders.get(column)
+        if cached is None:
+            values = _sort_keys(self.frame[column].reset_index(drop=True))
+            cached = self._sort_orders[column] = (values.sort_values(kind="stable").index.to_numpy(), values.isna().sum())
+        return ordered_positions(*cached, ascending, positions)
+
+    def sorted_batches(self, column, ascending=True, positions=None, batch_rows=10_000):
+        """Yield the rows of sorted() as Arrow tables of up to batch_rows rows, converting one batch at a time"""
+        order = self._sorted_positions(column, ascending, positions)
+        for start in range(0, max(len(order), 1), batch_rows):
+            # A Table, since Arrow-backed string columns can convert to chunked arrays, which a RecordBatch cannot hold
+            yield pa.Table.from_pandas(self.frame.iloc[order[start:start + batch_rows]], preserve_index=False)
+
+    def _row_frame(self, rows, labels):
+        """Build a frame of rows with the table's columns"""
+        return pd.DataFrame(rows, columns=self.frame.columns, index=list(labels))
+
+    def _labels_for_write(self, country_code):
+        """Return the labels a write keyed by country_code applies to"""
+        labels = self.labels("country_code", country_code)
+        if not labels:
+            raise ValueError(f"Country code {country_code} is not loaded")
+        return list(labels)
+
+    def _reindexed(self, frame, removed=None, added=None):
+        """Return a new table with the keys of the removed and added rows updated"""
+        removed = self.frame.iloc[:0] if removed is None else removed
+        added = self.frame.iloc[:0] if added is None else added
+
+        indexes = {}
+        for column, index in self._indexes.items():
+            # Changes are grouped by value, so each touched key is rebuilt once per write
+            changes = {}
+            for label, value in zip(removed.index, removed[column]):
+                changes.setdefault(value, (set(), []))[0].add(label)
+            for label, value in zip(added.index, added[column]):
+                if not pd.isna(value):
+                    changes.setdefault(value, (set(), []))[1].append(label)
+            index = dict(index)
+            for value, (dropped, new) in changes.items():
+                labels = [label for label in index.get(value, ()) if label not in dropped]
+                if new:
+                    labels = sorted(labels + new)
+                if labels:
+                    index[value] = tuple(labels)
+                else:
+                    index.pop(value, None)
+            indexes[column] = index
+
+        search_indexes = {}
+        for column, search_index in list(self._search_indexes.items()):
+            search_indexes[column] = search_index.update(removed.index, zip(added.index, added[column]))
+        return IndexedTable(frame, indexes, search_indexes, self.source_version)
+
+    def apply_edits(self, updated=None, inserted=(), deleted=()):
+        """Return a copy of the table with edits applied by row label.
+        
+        ``updated`` maps labels to replacement rows, ``inserted`` is a list
+        of new rows to append and ``deleted`` a list of labels to drop.
+        """
+        updated = self._row_frame(list((updated or {}).values()), list((updated or {}).keys()))
+        labels = range(self._next_label, self._next_label + len(inserted))
+        inserted = self._row_frame(list(inserted), labels)
+        deleted = list(deleted)
+        # New categories or wider integers apply to the whole copy
+        frame, updated, inserted = conform(self.frame, updated, inserted)
+
+        frame = frame.drop(index=deleted)
+        if len(updated):
+            frame.loc[updated.index] = updated
+        if len(inserted):
+            frame = pd.concat([frame, inserted])
+        removed = self.frame.loc[deleted + list(updated.index)]
+        return self._reindexed(frame, removed=removed, added=pd.concat([updated, inserted]))
+
+    # Writes mirror the SQL statements in DatabaseManager: rows are keyed by
+    # country_code, which is not unique since some countries use several
+    # currencies, so update and delete apply to every row with the code.
+
+    def insert(self, row):
+        """Return a copy of the table with row appended"""
+        return self.apply_edits(inserted=[row])
+
+    def replace(self, original_country_code, row):
+        """Return a copy of the table with the rows keyed by original_country_code replaced"""
+        labels = self._labels_for_write(original_country_code)
+        return self.apply_edits(updated={label: row for label in labels})
+
+    def delete(self, country_code):
+        """Return a copy of the table without the rows keyed by country_code"""
+        return self.apply_edits(deleted=self._labels_for_write(country_code))
@@ -0,0 +1,310 @@
+# File: src/lookup.py
+import argparse
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from src import export
+from src.database import DatabaseManager
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# How often the lookup maps are brought up to date with the warehouse table
+REFRESH_SECONDS = float(os.getenv('LOOKUP_REFRESH_SECONDS', '60'))
+# Interface the server listens on. It has no authentication and /export serves the whole table,
+# so it stays on localhost unless set to an interface only trusted clients can reach
+HOST = os.getenv('LOOKUP_HOST', '127.0.0.1')
+# Keys accepted in one request
+MAX_BATCH_KEYS = int(os.getenv('LOOKUP_MAX_BATCH_KEYS', '1000'))
+
+CURRENCY_FIELDS = ("currency_code", "currency_name", "currency_number")
+COUNTRY_FIELDS = ("country_code", "country", "country_number")
+
+
+def _group(frame, key, fields):
+    """Map each value of the key column to the JSON list of the fields of its rows"""
+    groups = {}
+    # Missing values become null, since NaN is not valid JSON
+    columns = [[None if pd.isna(value) else value for value in frame[field].tolist()] for field in fields]
+    for value, *row in zip(frame[key].tolist(), *columns):
+        if pd.isna(value):
+            continue
+        groups.setdefault(value, []).append(dict(zip(fields, row)))
+    return {value: json.dumps(rows, default=int, allow_nan=False) for value, rows in groups.items()}
+
+
+class LookupIndex:
+    """Read-only maps answering country code -> currencies and currency code -> countries.
+
+    Built once per table version. Each key's answer is kept as ready-made
+    JSON, so a batched response only joins strings.
+    """
+
+    def __init__(self, table):
+        frame = table.frame
+        self.table_version = table.version
+        self.source_version = table.source_version
+        self.rows = len(frame)
+        self.built_at = time.time()
+        self._currencies = _group(frame, "country_code", CURRENCY_FIELDS)
+        self._countries = _group(frame, "currency_code", COUNTRY_FIELDS)
+
+    def _lookup_json(self, groups, keys):
+        parts = [f"{json.dumps(key)}:{groups.get(key.strip().upper(), '[]')}" for key in keys]
+        return "{" + ",".join(parts) + "}"
+
+    def currencies_json(self, country_codes):
+        """Return a JSON object mapping each country code to its currencies ([] if unknown)"""
+        return self._lookup_json(self._currencies, country_codes)
+
+    def countries_json(self, currency_codes):
+        """Return a JSON object mapping each currency code to the countries using it ([] if unknown)"""
+        return self._lookup_json(self._countries, currency_codes)
+
+    def currencies(self, country_codes):
+        """Return a dict mapping each country code to a list of its currencies"""
+        return json.loads(self.currencies_json(country_codes))
+
+    def countries(self, currency_codes):
+        """Return a dict mapping each currency code to a list of the countries using it"""
+        return json.loads(self.countries_json(currency_codes))
+
+    def stats(self):
+        return {
+            "rows": self.rows,
+            "country_codes": len(self._currencies),
+            "currency_codes": len(self._countries),
+            "age_seconds": round(time.time() - self.built_at, 1),
+        }
+
+
+class LookupService:
+    """Serves lookups from a LookupIndex that a background thread keeps up to date.
+
+    The scheduled refresh brings the shared country table up to date, reading
+    just the change data feed when it can, and the index is rebuilt only if
+    the table changed. Readers always see a complete index, since a new one
+    replaces the old in a single step.
+    """
+
+    def __init__(self, db_manager, refresh_seconds=REFRESH_SECONDS):
+        self.db_manager = db_manager
+        self.refresh_seconds = refresh_seconds
+        self.index = LookupIndex(db_manager.get_country_table())
+        self._rebuild_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        metrics.register("lookup", lambda: self.index.stats())
+
+    def _rebuild(self, table):
+        """Replace the index if table is not the one it was built from"""
+        with self._rebuild_lock:
+            if table.version != self.index.table_version:
+                with metrics.span("lookup.rebuild", rows=len(table)):
+                    self.index = LookupIndex(table)
+        return self.index
+
+    def refresh(self):
+        """Bring the shared table up to date with the warehouse and rebuild the index if it changed"""
+        return self._rebuild(self.db_manager.refresh_country_table())
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                # Lookups keep being answered from the last index
+                logger.exception("Lookup refresh failed")
+                metrics.count("lookup.refresh.errors")
+
+    def start(self):
+        """Start refreshing the index on schedule from a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="lookup-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the scheduled refresh and the HTTP server, if running"""
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def serve(self, port, host=HOST):
+        """Answer lookups over HTTP from a background thread and return the server.
+
+        GET /currencies?codes=USA,GBR and GET /countries?codes=EUR,USD take
+        comma-separated or repeated codes; POST to the same paths takes a
+        JSON list of codes for larger batches. GET /health reports the index.
+        GET /export?format=csv&search=an&sort=country&order=desc streams the
+        rows the View tab shows for that search and sort as CSV, Parquet or
+        Arrow IPC.
+        """
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="lookup-http", daemon=True).start()
+        logger.info("Serving lookups on port %s", self._server.server_address[1])
+        return self._server
+
+
+def _handler(service):
+    """Build the request handler class of a LookupService"""
+
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive lets clients reuse one connection for many lookups, and
+        # without Nagle's algorithm the body is not held back waiting for an ACK
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _send(self, status, body):
+            body = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _answer(self, path, codes):
+            index = service.index
+            lookups = {"/currencies": index.currencies_json, "/countries": index.countries_json}
+            if path not in lookups:
+                self._send(404, json.dumps({"error": f"Unknown path {path}"}))
+            elif not codes:
+                self._send(400, json.dumps({"error": "No codes given"}))
+            elif len(codes) > MAX_BATCH_KEYS:
+                self._send(400, json.dumps({"error": f"At most {MAX_BATCH_KEYS} codes per request"}))
+            else:
+                with metrics.span("lookup.request", keys=len(codes)):
+                    self._send(200, lookups[path](codes))
+
+        def _export(self, query):
+            arguments = {name: values[-1] for name, values in parse_qs(query).items()}
+            file_format = arguments.get("format", "csv")
+            sort_column = arguments.get("sort", "country")
+            if file_format not in export.FORMATS:
+                self._send(400, json.dumps({"error": f"Unknown format {file_format}"}))
+                return
+            if sort_column not in DatabaseManager.COLUMNS:
+                self._send(400, json.dumps({"error": f"Unknown sort column {sort_column}"}))
+                return
+            batches = service.db_manager.iter_export(
+                arguments.get("search", ""), sort_column, arguments.get("order", "asc") != "desc"
+            )
+            with metrics.span("export.stream", format=file_format) as span:
+                chunks = export.stream(batches, file_format, DatabaseManager.COLUMNS)
+                try:
+                    # The first chunk is read before answering, so a failing query is still reported as an error
+                    first = next(chunks)
+                except Exception as e:
+                    logger.exception("Export failed")
+                    self._send(500, json.dumps({"error": str(e)}))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", export.FORMATS[file_format][1])
+                self.send_header("Content-Disposition", f'attachment; filename="countries.{file_format}"')
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                written = 0
+                try:
+                    # Chunked encoding sends each part as it is encoded, so the size need not be known up front
+                    for data in itertools.chain([first], chunks):
+                        if data:
+                            self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+                            written += len(data)
+                    self.wfile.write(b"0\r\n\r\n")
+                except Exception:
+                    # Without the final chunk the client sees the download as incomplete
+                    logger.exception("Export failed after %d bytes", written)
+                    self.close_connection = True
+                    chunks.close()
+                span.update(bytes=written)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/export":
+                self._export(url.query)
+                return
+            if url.path == "/health":
+                index = service.index
+                self._send(200, json.dumps({
+                    "table_version": index.table_version, "source_version": index.source_version, **index.stats()
+                }))
+                return
+            values = parse_qs(url.query).get("codes", [])
+            self._answer(url.path, [code for value in values for code in value.split(",") if code])
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            try:
+                codes = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or "[]")
+            except ValueError:
+                self._send(400, json.dumps({"error": "Body must be a JSON list of codes"}))
+                return
+            if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+                self._send(400, json.dumps({"error": "Body must be a JSON list of codes"}))
+                return
+            self._answer(url.path, codes)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return Handler
+
+
+# At most one service per process, however many Streamlit reruns ask for it
+_service = None
+_start_attempted = False
+_service_lock = threading.Lock()
+
+
+def start(db_manager, port, host=HOST):
+    """Start the process-wide lookup service on port, or return it if already started.
+
+    Returns None if the server could not be started. A port that could not
+    be bound is not tried again, so later reruns neither index the table
+    again nor log the failure again.
+    """
+    global _service, _start_attempted
+    with _service_lock:
+        if _start_attempted:
+            return _service
+        service = LookupService(db_manager)
+        _start_attempted = True
+        try:
+            service.serve(port, host)
+        except OSError as e:
+            logger.warning("Could not serve lookups on port %s: %s", port, e)
+            return None
+        _service = service.start()
+        return _service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve country/currency lookups over HTTP")
+    parser.add_argument("--port", type=int, default=int(os.getenv('LOOKUP_PORT', '8081')))
+    parser.add_argument("--host", default=HOST)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    service = start(DatabaseManager(), args.port, args.host)
+    if service is None:
+        raise SystemExit(1)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# File: src/metrics.py
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Most recent durations kept per span for the quantiles
+WINDOW = 1024
+PREFIX = "country_app"
+
+
+class _Histogram:
+    """Running count and sum of a span's durations, plus a window of recent ones"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+class Metrics:
+    """Process-wide span timings and counters.
+
+    ``span`` times a block, records it in a histogram named after the span
+    and writes it as a one-line JSON debug log. Collectors registered with
+    ``register`` add gauges, such as pool and cache statistics, to the
+    exports.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._collectors = {}
+        self._server = None
+        self._serve_attempted = False
+
+    def observe(self, name, seconds):
+        """Record a duration for name"""
+        with self._lock:
+            self._histograms.setdefault(name, _Histogram()).observe(seconds)
+
+    def count(self, name, amount=1):
+        """Add amount to the counter name"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def register(self, name, collect):
+        """Export the dict returned by collect() as gauges named after name"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def reset(self):
+        """Forget every recorded duration and counter"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    @contextmanager
+    def span(self, name, **fields):
+        """Time the block as name; the block can add fields such as rows to the yielded dict"""
+        started = time.perf_counter()
+        try:
+            yield fields
+        except Exception as e:
+            fields["error"] = type(e).__name__
+            self.count(f"{name}.errors")
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.observe(name, seconds)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(json.dumps({"span": name, "ms": round(seconds * 1000, 3), **fields}, default=str))
+
+    def timed(self, name):
+        """Decorator timing every call of a function as a span"""
+        def decorate(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _collect(self):
+        """Call every collector, skipping those that fail"""
+        with self._lock:
+            collectors = dict(self._collectors)
+        gauges = {}
+        for name, collect in collectors.items():
+            try:
+                gauges[name] = collect()
+            except Exception:
+                logger.exception("Metrics collector %s failed", name)
+        return gauges
+
+    def summary(self):
+        """Return one row per span with its call count, mean and quantiles in milliseconds"""
+        with self._lock:
+            histograms = {name: (h.count, h.total, h.quantiles()) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+        rows = []
+        for name, (count, total, quantiles) in sorted(histograms.items()):
+            row = {"span": name, "calls": count, "errors": counters.get(f"{name}.errors", 0),
+                   "mean_ms": round(total / count * 1000, 2)}
+            row.update({f"p{int(q * 100)}_ms": round(value * 1000, 2) for q, value in quantiles.items()})
+            rows.append(row)
+        return rows
+
+    def prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {name: (h.count, h.total, h.quantiles()) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+        lines = [f"# TYPE {PREFIX}_span_seconds summary"]
+        for name, (count, total, quantiles) in sorted(histograms.items()):
+            for q, value in quantiles.items():
+                lines.append(f'{PREFIX}_span_seconds{{span="{name}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{PREFIX}_span_seconds_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'{PREFIX}_span_seconds_count{{span="{name}"}} {count}')
+        lines.append(f"# TYPE {PREFIX}_events_total counter")
+        for name, value in sorted(counters.items()):
+            lines.append(f'{PREFIX}_events_total{{event="{name}"}} {value}')
+        for collector, values in sorted(self._collect().items()):
+            lines.append(f"# TYPE {PREFIX}_{collector} gauge")
+            for stat, value in sorted(values.items()):
+                lines.append(f'{PREFIX}_{collector}{{stat="{stat}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="0.0.0.0"):
+        """Serve prometheus() at /metrics from a background thread.
+
+        Only the first call in the process starts the server; later calls
+        return it, or None if it could not be started.
+        """
+        with self._lock:
+            if self._serve_attempted:
+                return self._server
+            self._serve_attempted = True
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = metrics.prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    logger.debug(format, *args)
+
+            try:
+                self._server = ThreadingHTTPServer((host, port), Handler)
+            except OSError as e:
+                logger.warning("Could not serve metrics on port %s: %s", port, e)
+                return None
+            threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+            logger.info("Serving metrics on port %s", port)
+            return self._server
+
+
+# Shared by every module and session in the process
+metrics = Metrics()
@@ -0,0 +1,192 @@
+# File: src/pool.py
+import threading
+import time
+from contextlib import contextmanager
+
+from src.statements import StatementCancelled
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable warehouse connections.
+
+    Connections are handed out LIFO so the warmest session is reused first.
+    Idle connections older than ``max_idle_seconds`` are closed on the next
+    checkout, and connections idle longer than ``health_check_after`` are
+    probed with ``SELECT 1`` before being handed out again. Only errors in
+    ``connection_errors``, or a connection that reports itself closed, mean
+    the connection is lost; after any other error, such as a failing
+    statement, it is returned to the pool.
+    """
+
+    def __init__(self, connect, size=4, max_idle_seconds=300.0,
+                 health_check_after=30.0, checkout_timeout=30.0, connection_errors=()):
+        self._connect = connect
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+        self.connection_errors = tuple(connection_errors)
+
+        self._idle = []  # [(connection, last_used), ...], most recent last
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "health_check_failures": 0,
+            "reconnects": 0,
+            "in_use": 0,
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def stats(self):
+        """Return a snapshot of pool hit/miss counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["idle"] = len(self._idle)
+        snapshot["size"] = self.size
+        return snapshot
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _evict_idle(self):
+        """Close idle connections that exceeded max_idle_seconds"""
+        cutoff = time.monotonic() - self.max_idle_seconds
+        with self._lock:
+            expired = [conn for conn, last_used in self._idle if last_used < cutoff]
+            self._idle = [(conn, last_used) for conn, last_used in self._idle if last_used >= cutoff]
+            self._stats["evictions"] += len(expired)
+        for connection in expired:
+            self._close(connection)
+
+    def _is_healthy(self, connection, last_used):
+        """Check a pooled connection before handing it out"""
+        if not getattr(connection, "open", True):
+            return False
+        if time.monotonic() - last_used < self.health_check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def _checkout(self, fresh=False):
+        """Take a slot and return (connection, reused)"""
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError(f"No database connection available within {self.checkout_timeout}s")
+        try:
+            self._evict_idle()
+            while not fresh:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, last_used = self._idle.pop()
+                if self._is_healthy(connection, last_used):
+                    with self._lock:
+                        self._stats["hits"] += 1
+                        self._stats["in_use"] += 1
+                    return connection, True
+                self._count("health_check_failures")
+                self._close(connection)
+
+            connection = self._connect()
+            with self._lock:
+                self._stats["misses"] += 1
+                self._stats["in_use"] += 1
+            return connection, False
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, connection):
+        with self._lock:
+            self._stats["in_use"] -= 1
+            self._idle.append((connection, time.monotonic()))
+        self._slots.release()
+
+    def _discard(self, connection):
+        self._count("in_use", -1)
+        self._close(connection)
+        self._slots.release()
+
+    def _lost(self, connection, error):
+        """Check whether error means the connection itself failed, rather than the work done on it"""
+        # Statements cancelled on the warehouse say themselves whether their session survived
+        usable = getattr(error, "connection_usable", None)
+        if usable is not None:
+            return not usable
+        if not isinstance(error, Exception):
+            return True
+        return isinstance(error, self.connection_errors) or not getattr(connection, "open", True)
+
+    def _release(self, connection, error):
+        """Return a connection whose work raised error, closing it if the error means it was lost"""
+        if self._lost(connection, error):
+            self._discard(connection)
+        else:
+            self._checkin(connection)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the block.
+
+        The connection is returned to the pool when the block ends, and
+        closed instead if the block raises an error meaning it was lost.
+        """
+        connection, _ = self._checkout()
+        try:
+            yield connection
+        except GeneratorExit:
+            # A generator reading through the connection was closed early,
+            # which leaves the connection itself usable
+            self._checkin(connection)
+            raise
+        except BaseException as e:
+            self._release(connection, e)
+            raise
+        self._checkin(connection)
+
+    def run(self, work, retries=1):
+        """Call ``work(connection)`` on a pooled connection.
+
+        If the connection turns out to be lost on a reused connection (for
+        example because the warehouse expired its session), it is dropped and
+        the call is retried on a freshly opened one, up to ``retries`` times.
+        Errors of the work itself are raised without a retry. Work that must
+        not run twice, such as a write that may have been applied before the
+        connection failed, passes ``retries=0``.
+        """
+        fresh = False
+        for attempt in range(retries + 1):
+            connection, reused = self._checkout(fresh=fresh)
+            try:
+                result = work(connection)
+            except Exception as e:
+                lost = self._lost(connection, e)
+                self._release(connection, e)
+                # A statement that ran out of time would only time out again, and a superseded one is not wanted
+                if lost and reused and attempt < retries and not isinstance(e, (TimeoutError, StatementCancelled)):
+                    self._count("reconnects")
+                    fresh = True
+                    continue
+                raise
+            self._checkin(connection)
+            return result
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
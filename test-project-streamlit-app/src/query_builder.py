@@ -0,0 +1,101 @@
+# File: src/query_builder.py
+
+TABLE = "test_project.country_code_to_currency.country_currency_table"
+COLUMNS = ["country_code", "country_number", "country", "currency_name", "currency_code", "currency_number"]
+SEARCH_COLUMN = "country"
+
+
+def escape_like(text):
+    """Escape LIKE wildcards with "!" so user input is matched literally"""
+    return text.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def build_where(search=""):
+    """Return a case-insensitive substring filter on the search column and its parameters"""
+    if not search:
+        return "", ()
+    return f" WHERE {SEARCH_COLUMN} ILIKE ? ESCAPE '!'", (f"%{escape_like(search)}%",)
+
+
+def build_count_query(search=""):
+    """Build a query counting the rows that match search"""
+    where, params = build_where(search)
+    return f"SELECT COUNT(*) AS row_count FROM {TABLE}{where}", params
+
+
+def build_sorted_query(search="", sort_column=SEARCH_COLUMN, ascending=True):
+    """Build a query returning all the rows that match search, sorted by sort_column.
+
+    The sort column is checked against a whitelist since it cannot be passed
+    as a parameter, and country_code is added as a tie-breaker so the order
+    is stable between requests.
+    """
+    if sort_column not in COLUMNS:
+        raise ValueError(f"Cannot sort by unknown column {sort_column!r}")
+    direction = "ASC" if ascending else "DESC"
+    order_by = f"{sort_column} {direction}"
+    if sort_column != "country_code":
+        order_by += f", country_code {direction}"
+
+    where, params = build_where(search)
+    return f"SELECT {', '.join(COLUMNS)} FROM {TABLE}{where} ORDER BY {order_by}", params
+
+
+def build_page_query(search="", sort_column=SEARCH_COLUMN, ascending=True, limit=50, offset=0):
+    """Build a query returning one page of the rows of build_sorted_query, so pages are stable between requests"""
+    query, params = build_sorted_query(search, sort_column, ascending)
+    return f"{query} LIMIT {int(limit)} OFFSET {int(offset)}", params
+
+
+# country_code alone is not unique (some countries use several currencies)
+UPSERT_KEYS = ["country_code", "country", "currency_code"]
+
+
+def build_upsert_query(row_count):
+    """Build a MERGE that inserts or updates row_count rows passed as positional parameters.
+
+    Parameters are the rows' values in COLUMNS order, flattened row by row.
+    """
+    row = "(" + ", ".join(["?"] * len(COLUMNS)) + ")"
+    match = " AND ".join(f"target.{column} = source.{column}" for column in UPSERT_KEYS)
+    updates = ", ".join(f"{column} = source.{column}" for column in COLUMNS if column not in UPSERT_KEYS)
+    return (
+        f"MERGE INTO {TABLE} AS target"
+        f" USING (VALUES {', '.join([row] * row_count)}) AS source({', '.join(COLUMNS)})"
+        f" ON {match}"
+        f" WHEN MATCHED THEN UPDATE SET {updates}"
+        f" WHEN NOT MATCHED THEN INSERT ({', '.join(COLUMNS)})"
+        f" VALUES ({', '.join(f'source.{column}' for column in COLUMNS)})"
+    )
+
+
+def build_edit_query(row_count):
+    """Build a MERGE applying a mix of inserts, updates and deletes in one statement.
+
+    Each row's parameters are the change ("insert", "update" or "delete"),
+    the original values of UPSERT_KEYS identifying the target row (NULL for
+    inserts), then the new values in COLUMNS order (NULL for deletes).
+    """
+    source_columns = ["change"] + [f"original_{column}" for column in UPSERT_KEYS] + COLUMNS
+    row = "(" + ", ".join(["?"] * len(source_columns)) + ")"
+    match = " AND ".join(f"target.{column} = source.original_{column}" for column in UPSERT_KEYS)
+    updates = ", ".join(f"{column} = source.{column}" for column in COLUMNS)
+    return (
+        f"MERGE INTO {TABLE} AS target"
+        f" USING (VALUES {', '.join([row] * row_count)}) AS source({', '.join(source_columns)})"
+        f" ON {match}"
+        f" WHEN MATCHED AND source.change = 'delete' THEN DELETE"
+        f" WHEN MATCHED AND source.change = 'update' THEN UPDATE SET {updates}"
+        f" WHEN NOT MATCHED AND source.change = 'insert' THEN INSERT ({', '.join(COLUMNS)})"
+        f" VALUES ({', '.join(f'source.{column}' for column in COLUMNS)})"
+    )
+
+
+def build_version_query():
+    """Build a query returning the table's latest Delta version in a "version" column"""
+    return f"DESCRIBE HISTORY {TABLE} LIMIT 1"
+
+
+def build_changes_query(start_version, end_version):
+    """Build a query for the change data feed rows committed between two table versions, inclusive"""
+    return f"SELECT * FROM table_changes('{TABLE}', {int(start_version)}, {int(end_version)})"
@@ -0,0 +1,89 @@
+# File: src/search_index.py
+import pandas as pd
+
+GRAM_SIZE = 3
+
+# Queries containing these characters are regular expressions to str.contains
+REGEX_CHARS = set(".^$*+?{}[]\\|()")
+
+
+def _grams(text):
+    """Return the set of trigrams in text"""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class NgramIndex:
+    """Trigram index answering case-insensitive substring queries on one column.
+
+    A query of three or more characters is answered by intersecting the
+    posting lists of its trigrams and confirming each candidate, which gives
+    the same rows as ``str.contains(query, case=False)``. Like IndexedTable,
+    the index is shared between sessions, so add/remove return a new index
+    that copies only the posting lists they touch.
+    """
+
+    def __init__(self, texts, postings):
+        self._texts = texts  # label -> lower-cased text
+        self._postings = postings  # trigram -> frozenset of labels
+
+    @classmethod
+    def build(cls, frame, column):
+        """Index the non-null values of column"""
+        texts = {}
+        postings = {}
+        for label, value in zip(frame.index.tolist(), frame[column].tolist()):
+            if pd.isna(value):
+                continue
+            text = str(value).lower()
+            texts[label] = text
+            for gram in _grams(text):
+                postings.setdefault(gram, set()).add(label)
+        return cls(texts, {gram: frozenset(labels) for gram, labels in postings.items()})
+
+    @staticmethod
+    def can_answer(query):
+        """Check whether query can be answered from trigrams alone"""
+        return len(query) >= GRAM_SIZE and not REGEX_CHARS.intersection(query)
+
+    def search(self, query):
+        """Return the sorted labels whose text contains query, ignoring case"""
+        query = query.lower()
+        postings = sorted((self._postings.get(gram, frozenset()) for gram in _grams(query)), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return sorted(label for label in candidates if query in self._texts[label])
+
+    def update(self, removed=(), added=()):
+        """Return a copy of the index without the removed labels and with the added (label, value) pairs.
+
+        The index is copied once per call and each posting list touched is
+        rebuilt once, however many rows the write changes.
+        """
+        texts = dict(self._texts)
+        dropped, new = {}, {}
+        for label in removed:
+            text = texts.pop(label, None)
+            if text is not None:
+                for gram in _grams(text):
+                    dropped.setdefault(gram, set()).add(label)
+        for label, value in added:
+            if pd.isna(value):
+                continue
+            text = texts[label] = str(value).lower()
+            for gram in _grams(text):
+                new.setdefault(gram, set()).add(label)
+        postings = dict(self._postings)
+        for gram in dropped.keys() | new.keys():
+            labels = (postings.get(gram, frozenset()) - dropped.get(gram, set())) | new.get(gram, set())
+            if labels:
+                postings[gram] = frozenset(labels)
+            else:
+                postings.pop(gram, None)
+        return NgramIndex(texts, postings)
+
+    def add(self, label, value):
+        """Return a copy of the index with value indexed under label"""
+        return self.update(added=[(label, value)])
+
+    def remove(self, label):
+        """Return a copy of the index without label"""
+        return self.update(removed=[label])
@@ -0,0 +1,73 @@
+# File: src/snapshot.py
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+import pyarrow as pa
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "country_currency_snapshots")
+# Schema metadata key holding the snapshot's own fields
+METADATA_KEY = b"country_currency_snapshot"
+
+
+@dataclass
+class Snapshot:
+    """A table read from disk with the warehouse table version it was loaded at"""
+    table: pa.Table
+    table_version: int = None
+    saved_at: float = 0.0
+
+    @property
+    def age_seconds(self):
+        return time.time() - self.saved_at
+
+
+def snapshot_path(directory, *parts):
+    """Return the snapshot file in directory for the source identified by parts"""
+    name = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:16]
+    return os.path.join(directory, f"{name}.arrow")
+
+
+def write_snapshot(path, table, table_version=None):
+    """Write table to path as an uncompressed Arrow IPC (Feather v2) file.
+
+    The file is written next to its destination and renamed over it, so a
+    reader never sees a partial snapshot, and processes that still map the
+    previous file keep reading it until they let go.
+    """
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps({"table_version": table_version, "saved_at": time.time()}).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def read_snapshot(path):
+    """Memory-map the snapshot at path, or return None if there is no readable one.
+
+    The returned table's buffers point into the mapped file, so nothing is
+    copied until the rows are converted or modified.
+    """
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = dict(table.schema.metadata or {})
+    fields = json.loads(metadata.pop(METADATA_KEY, b"{}"))
+    return Snapshot(
+        table.replace_schema_metadata(metadata or None),
+        fields.get("table_version"),
+        fields.get("saved_at", 0.0),
+    )
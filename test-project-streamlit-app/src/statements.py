@@ -0,0 +1,174 @@
+# File: src/statements.py
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# How often the watcher checks running statements against their deadlines
+POLL_SECONDS = 0.1
+# How long a cancelled statement waits for cursor.cancel() to return before its connection is given up
+CANCEL_WAIT_SECONDS = 5.0
+
+
+class StatementCancelled(Exception):
+    """Raised for a statement cancelled because a newer run of its session superseded it"""
+
+
+def _stopped(error, connection_usable):
+    """Mark an error raised for a cancelled statement with whether its connection can be reused"""
+    # ConnectionPool checks usable connections back in instead of reconnecting
+    error.connection_usable = connection_usable
+    return error
+
+
+class Run:
+    """One Streamlit run of a session, holding the reads it has in flight"""
+
+    def __init__(self):
+        self.superseded = False
+        self.statements = set()
+
+
+# The run statements issued here belong to; None outside any run, as for loads shared by every session.
+# Executor work submitted with a copy of the context belongs to the run that submitted it
+_current_run = contextvars.ContextVar("statement_run", default=None)
+
+
+def current_run():
+    """Return the run statements issued in this context belong to, or None"""
+    return _current_run.get()
+
+
+@contextmanager
+def unscoped():
+    """Issue the block's statements outside any run, so no session's rerun cancels them"""
+    token = _current_run.set(None)
+    try:
+        yield
+    finally:
+        _current_run.reset(token)
+
+
+class _Statement:
+    __slots__ = ("cursor", "deadline", "run", "reason", "cancelled", "settled")
+
+    def __init__(self, cursor, deadline, run):
+        self.cursor = cursor
+        self.deadline = deadline
+        self.run = run
+        # Why it was cancelled, once it is, and whether the warehouse accepted the cancel
+        self.reason = None
+        self.cancelled = False
+        # Set once cursor.cancel() has returned or failed
+        self.settled = threading.Event()
+
+
+class StatementTracker:
+    """Warehouse statements in flight in the process, cancelled past their deadline or once superseded.
+
+    Sessions call begin_run at the start of every Streamlit run. Reads issued
+    during a run are cancelled on the warehouse as soon as the session's next
+    run begins, since their results would only be thrown away. A single
+    watcher thread enforces every statement's deadline, instead of a timer
+    thread per statement.
+    """
+
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._statements = set()
+        self._cancelled = {"superseded": 0, "deadline": 0}
+        self._watcher = None
+
+    def begin_run(self, previous=None):
+        """Start a run in the current context and return it, cancelling the reads previous still has in flight"""
+        run = Run()
+        _current_run.set(run)
+        if previous is not None:
+            with self._lock:
+                previous.superseded = True
+                stale = list(previous.statements)
+            for statement in stale:
+                self._cancel(statement, "superseded")
+        return run
+
+    @contextmanager
+    def track(self, cursor, timeout, run=None):
+        """Track the cursor's statement until the block ends, cancelling it at its deadline or when run is superseded.
+
+        A cancelled statement raises TimeoutError or StatementCancelled from
+        the error the cursor failed with. Statements of a run that was
+        already superseded are not started at all.
+        """
+        statement = _Statement(cursor, time.monotonic() + timeout, run)
+        with self._lock:
+            if run is not None and run.superseded:
+                self._cancelled["superseded"] += 1
+                superseded = True
+            else:
+                superseded = False
+                self._statements.add(statement)
+                if run is not None:
+                    run.statements.add(statement)
+                if self._watcher is None:
+                    self._watcher = threading.Thread(target=self._watch, name="statement-deadlines", daemon=True)
+                    self._watcher.start()
+        if superseded:
+            metrics.count("db.cancelled.superseded")
+            raise _stopped(StatementCancelled("Query not started, superseded by a newer run"), True)
+        try:
+            yield
+        except Exception as e:
+            if statement.reason is not None:
+                # The cursor can fail as soon as the warehouse cancels, before cancel() has returned
+                statement.settled.wait(CANCEL_WAIT_SECONDS)
+            if statement.reason == "deadline":
+                raise _stopped(TimeoutError(f"Query cancelled after {timeout:g}s"), statement.cancelled) from e
+            if statement.reason == "superseded":
+                raise _stopped(
+                    StatementCancelled("Query cancelled, superseded by a newer run"), statement.cancelled
+                ) from e
+            raise
+        finally:
+            with self._lock:
+                self._statements.discard(statement)
+                if run is not None:
+                    run.statements.discard(statement)
+
+    def _cancel(self, statement, reason):
+        """Cancel a statement on the warehouse, unless it has finished or was cancelled already"""
+        with self._lock:
+            if statement.reason is not None or statement not in self._statements:
+                return
+            statement.reason = reason
+            self._cancelled[reason] += 1
+        metrics.count(f"db.cancelled.{reason}")
+        try:
+            statement.cursor.cancel()
+            statement.cancelled = True
+        except Exception as e:
+            logger.warning("Could not cancel statement: %s", e)
+        finally:
+            statement.settled.set()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            now = time.monotonic()
+            with self._lock:
+                expired = [statement for statement in self._statements if now >= statement.deadline]
+            for statement in expired:
+                self._cancel(statement, "deadline")
+
+    def stats(self):
+        """Return the number of statements in flight and of those cancelled, by reason"""
+        with self._lock:
+            return {
+                "in_flight": len(self._statements),
+                **{f"cancelled_{reason}": count for reason, count in self._cancelled.items()},
+            }
@@ -1,365 +1,530 @@
-# File: src/ui.py
-import streamlit as st
-import pandas as pd
-from templates.html_components import *
-
-class CountryCurrencyUI:
-    """Class to handle the Streamlit UI"""
-    
-    # File: src/ui.py (modified __init__ method)
-    def __init__(self, db_manager):
-        self.db_manager = db_manager
-        
-        # Initialize session state for tracking operations
-        if 'operation_performed' not in st.session_state:
-            st.session_state.operation_performed = False
-        if 'operation_message' not in st.session_state:
-            st.session_state.operation_message = ""
-        if 'operation_status' not in st.session_state:
-            st.session_state.operation_status = ""
-        
-        # Load data - this will refresh on each rerun
-        self.data = self.db_manager.get_all_countries()
-
-    
-    def set_operation_status(self, message, status):
-        """Set operation status in session state and trigger rerun"""
-        st.session_state.operation_performed = True
-        st.session_state.operation_message = message
-        st.session_state.operation_status = status
-        st.rerun()
-    
-    def display_operation_feedback(self):
-        """Display operation feedback messages with custom styling"""
-        if st.session_state.operation_performed:
-            if st.session_state.operation_status == "success":
-                st.markdown(success_message(st.session_state.operation_message), unsafe_allow_html=True)
-            else:
-                st.markdown(error_message(st.session_state.operation_message), unsafe_allow_html=True)
-            # Reset the flag after displaying
-            st.session_state.operation_performed = False
-    
-    def render_view_tab(self):
-        """Render the View tab with enhanced styling"""
-        st.markdown(section_header("📊", "View Countries and Currencies"), unsafe_allow_html=True)
-        
-        # Search card
-        st.markdown(card_start(), unsafe_allow_html=True)
-        st.markdown(
-            field_label("Search by Country Name", "Enter a partial or full country name to filter the data."), 
-            unsafe_allow_html=True
-        )
-        
-        country = st.text_input("", placeholder="Type country name here...", key="view_country_filter")
-        
-        if country:
-            filtered_data = self.data[self.data["country"].str.contains(country, case=False, na=False)]
-            
-            count = len(filtered_data)
-            st.markdown(f"""
-            <div style="margin-top: 15px;">
-                Found <span class="badge">{count}</span> results for '{country}'
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown(dataframe_container_start(), unsafe_allow_html=True)
-            st.dataframe(filtered_data, use_container_width=True)
-            st.markdown(dataframe_container_end(), unsafe_allow_html=True)
-        st.markdown(card_end(), unsafe_allow_html=True)
-        
-        # Sort card
-        st.markdown(card_start(), unsafe_allow_html=True)
-        st.markdown(
-            field_label("Sort Data", "Choose a column and sort direction to organize the data."), 
-            unsafe_allow_html=True
-        )
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            sort_column = st.selectbox("Column", self.data.columns)
-        with col2:
-            sort_order = st.radio("Order", ["Ascending", "Descending"])
-        
-        ascending = True if sort_order == "Ascending" else False
-        sorted_data = self.data.sort_values(by=sort_column, ascending=ascending)
-        
-        st.markdown(dataframe_container_start(), unsafe_allow_html=True)
-        st.dataframe(sorted_data, use_container_width=True)
-        st.markdown(dataframe_container_end(), unsafe_allow_html=True)
-        st.markdown(card_end(), unsafe_allow_html=True)
-    
-    def render_add_tab(self):
-        """Render the Add Entry tab with enhanced styling"""
-        st.markdown(section_header("➕", "Add New Country/Currency Entry"), unsafe_allow_html=True)
-        
-        st.markdown(card_start(), unsafe_allow_html=True)
-        # Form for creating a new entry
-        with st.form(key="add_entry_form"):
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown(field_label("Country Information"), unsafe_allow_html=True)
-                
-                st.markdown(
-                    tooltip_field("Country Code (ISO Alpha-3)", "Three-letter country code (e.g., USA, GBR)"), 
-                    unsafe_allow_html=True
-                )
-                new_country_code = st.text_input("", placeholder="e.g. USA", max_chars=3, key="add_code").upper()
-                
-                st.markdown(
-                    tooltip_field("Country Number", "Numeric code assigned to the country"), 
-                    unsafe_allow_html=True
-                )
-                new_country_number = st.text_input("", placeholder="e.g. 840", key="add_country_num")
-                
-                st.markdown(
-                    tooltip_field("Country Name", "Full official name of the country"), 
-                    unsafe_allow_html=True
-                )
-                new_country = st.text_input("", placeholder="e.g. UNITED STATES", key="add_country_name").upper()
-            
-            with col2:
-                st.markdown(field_label("Currency Information"), unsafe_allow_html=True)
-                
-                st.markdown(
-                    tooltip_field("Currency Name", "Full name of the country's currency"), 
-                    unsafe_allow_html=True
-                )
-                new_currency_name = st.text_input("", placeholder="e.g. US Dollar", key="add_currency_name")
-                
-                st.markdown(
-                    tooltip_field("Currency Code", "Three-letter currency code (e.g., USD, EUR)"), 
-                    unsafe_allow_html=True
-                )
-                new_currency_code = st.text_input("", placeholder="e.g. USD", max_chars=3, key="add_currency_code").upper()
-                
-                st.markdown(
-                    tooltip_field("Currency Number", "Numeric code assigned to the currency"), 
-                    unsafe_allow_html=True
-                )
-                new_currency_number = st.text_input("", placeholder="e.g. 840", key="add_currency_num")
-            
-            st.markdown('<br>', unsafe_allow_html=True)
-            submit_button = st.form_submit_button(label="➕ Add New Entry")
-            
-            if submit_button:
-                # Validate inputs
-                if not (new_country_code and new_country_number and new_country and 
-                        new_currency_name and new_currency_code and new_currency_number):
-                    self.set_operation_status("All fields are required!", "error")
-                else:
-                    try:
-                        # Check if country code already exists
-                        existing = self.data[self.data['country_code'] == new_country_code]
-                        if not existing.empty:
-                            self.set_operation_status(f"Country code {new_country_code} already exists!", "error")
-                        else:
-                            success = self.db_manager.add_country(
-                                new_country_code, new_country_number, new_country,
-                                new_currency_name, new_currency_code, new_currency_number
-                            )
-                            
-                            if success:
-                                self.set_operation_status("Entry added successfully!", "success")
-                            else:
-                                self.set_operation_status("Failed to add entry. Please try again.", "error")
-                    except Exception as e:
-                        self.set_operation_status(f"Error: {str(e)}", "error")
-        st.markdown(card_end(), unsafe_allow_html=True)
-    
-    def render_edit_tab(self):
-        """Render the Edit Entry tab with enhanced styling"""
-        st.markdown(section_header("✏️", "Edit Existing Entry"), unsafe_allow_html=True)
-        
-        st.markdown(card_start(), unsafe_allow_html=True)
-        st.markdown(
-            field_label("Select Country to Edit", "Choose the country record you want to modify."), 
-            unsafe_allow_html=True
-        )
-        
-        # First, select a country to edit
-        country_to_edit = st.selectbox(
-            "",
-            options=self.data['country'].tolist(),
-            format_func=lambda x: x,
-            index=0
-        )
-        
-        # Get the selected country's data
-        selected_row = self.data[self.data['country'] == country_to_edit].iloc[0]
-        
-        # Display current data
-        st.markdown('<div style="margin-top: 20px;">', unsafe_allow_html=True)
-        st.markdown(field_label("Current Data:"), unsafe_allow_html=True)
-        st.markdown(dataframe_container_start(), unsafe_allow_html=True)
-        st.dataframe(pd.DataFrame([selected_row]), use_container_width=True)
-        st.markdown(dataframe_container_end(), unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Form for editing
-        with st.form(key="edit_entry_form"):
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown(field_label("Country Information"), unsafe_allow_html=True)
-                
-                st.markdown(
-                    tooltip_field("Country Code (ISO Alpha-3)", "Three-letter country code (e.g., USA, GBR)"), 
-                    unsafe_allow_html=True
-                )
-                edit_country_code = st.text_input("", 
-                                               value=selected_row['country_code'], 
-                                               max_chars=3,
-                                               key="edit_code").upper()
-                
-                st.markdown(
-                    tooltip_field("Country Number", "Numeric code assigned to the country"), 
-                    unsafe_allow_html=True
-                )
-                edit_country_number = st.text_input("", 
-                                                 value=str(selected_row['country_number']),
-                                                 key="edit_country_num")
-                
-                st.markdown(
-                    tooltip_field("Country Name", "Full official name of the country"), 
-                    unsafe_allow_html=True
-                )
-                edit_country = st.text_input("", 
-                                          value=selected_row['country'],
-                                          key="edit_country_name").upper()
-            
-            with col2:
-                st.markdown(field_label("Currency Information"), unsafe_allow_html=True)
-                
-                st.markdown(
-                    tooltip_field("Currency Name", "Full name of the country's currency"), 
-                    unsafe_allow_html=True
-                )
-                edit_currency_name = st.text_input("", 
-                                               value=selected_row['currency_name'],
-                                               key="edit_currency_name")
-                
-                st.markdown(
-                    tooltip_field("Currency Code", "Three-letter currency code (e.g., USD, EUR)"), 
-                    unsafe_allow_html=True
-                )
-                edit_currency_code = st.text_input("", 
-                                               value=selected_row['currency_code'], 
-                                               max_chars=3,
-                                               key="edit_currency_code").upper()
-                
-                st.markdown(
-                    tooltip_field("Currency Number", "Numeric code assigned to the currency"), 
-                    unsafe_allow_html=True
-                )
-                edit_currency_number = st.text_input("", 
-                                                 value=str(selected_row['currency_number']),
-                                                 key="edit_currency_num")
-            
-            st.markdown('<br>', unsafe_allow_html=True)
-            submit_button = st.form_submit_button(label="✅ Update Entry")
-            
-            if submit_button:
-                # Validate inputs
-                if not (edit_country_code and edit_country_number and edit_country and 
-                        edit_currency_name and edit_currency_code and edit_currency_number):
-                    self.set_operation_status("All fields are required!", "error")
-                else:
-                    try:
-                        success = self.db_manager.update_country(
-                            selected_row['country_code'],  # Original code
-                            edit_country_code, edit_country_number, edit_country,
-                            edit_currency_name, edit_currency_code, edit_currency_number
-                        )
-                        
-                        if success:
-                            self.set_operation_status("Entry updated successfully!", "success")
-                        else:
-                            self.set_operation_status("Failed to update entry. Please try again.", "error")
-                    except Exception as e:
-                        self.set_operation_status(f"Error: {str(e)}", "error")
-        st.markdown(card_end(), unsafe_allow_html=True)
-    
-    def render_delete_tab(self):
-        """Render the Delete Entry tab with enhanced styling"""
-        st.markdown(section_header("🗑️", "Delete Entry"), unsafe_allow_html=True)
-        st.markdown(delete_warning(), unsafe_allow_html=True)
-        
-        st.markdown(card_start(), unsafe_allow_html=True)
-        st.markdown(
-            field_label("Select Country to Delete", "Choose the country record you want to remove from the database."), 
-            unsafe_allow_html=True
-        )
-        
-        # Select a country to delete
-        country_to_delete = st.selectbox(
-            "",
-            options=self.data['country'].tolist(),
-            format_func=lambda x: x,
-            key="delete_country"
-        )
-        
-        # Get the selected country's data
-        if country_to_delete:
-            selected_row = self.data[self.data['country'] == country_to_delete].iloc[0]
-            
-            # Display the selected entry
-            st.markdown('<div style="margin-top: 20px;">', unsafe_allow_html=True)
-            st.markdown(field_label("Entry to delete:"), unsafe_allow_html=True)
-            st.markdown(dataframe_container_start("#e74c3c"), unsafe_allow_html=True)
-            st.dataframe(pd.DataFrame([selected_row]), use_container_width=True)
-            st.markdown(dataframe_container_end(), unsafe_allow_html=True)
-            
-            # Confirmation
-            confirmation_container = st.container()
-            with confirmation_container:
-                st.markdown(delete_confirmation(), unsafe_allow_html=True)
-                delete_confirmation_checkbox = st.checkbox("I confirm that I want to delete this entry")
-            
-            # Using custom CSS for the delete button
-            if delete_confirmation_checkbox:
-                if st.button("🗑️ Delete Entry", type="primary"):
-                    try:
-                        success = self.db_manager.delete_country(selected_row['country_code'])
-                        
-                        if success:
-                            self.set_operation_status("Entry deleted successfully!", "success")
-                        else:
-                            self.set_operation_status("Failed to delete entry. Please try again.", "error")
-                    except Exception as e:
-                        self.set_operation_status(f"Error: {str(e)}", "error")
-            else:
-                st.markdown(disabled_button(), unsafe_allow_html=True)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
-        st.markdown(card_end(), unsafe_allow_html=True)
-    
-    def render(self):
-        """Render the full UI with enhanced styling"""
-        # App title with HTML
-        st.markdown(app_header(), unsafe_allow_html=True)
-        
-        # Display operation feedback if any
-        self.display_operation_feedback()
-        
-        # Create tabs for different operations with emojis
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "📊 View Data", 
-            "➕ Add Entry", 
-            "✏️ Edit Entry", 
-            "🗑️ Delete Entry"
-        ])
-        
-        # Render each tab
-        with tab1:
-            self.render_view_tab()
-        
-        with tab2:
-            self.render_add_tab()
-        
-        with tab3:
-            self.render_edit_tab()
-        
-        with tab4:
-            self.render_delete_tab()
-        
-        # Footer
-        st.markdown(footer(), unsafe_allow_html=True)
+# File: src/ui.py
+import os
+import tempfile
+from urllib.parse import urlencode
+import streamlit as st
+import pandas as pd
+from templates.html_components import *
+from src import export
+from src.bulk_import import import_csv
+from src.compact import expand
+from src.grid_edit import diff_table
+from src.metrics import metrics
+from src.utils import render_html
+
+# Rows per page offered when the View tab pages through results (pushdown and arrow modes)
+PAGE_SIZES = [50, 500, 5000]
+
+# Sections of the page and the methods rendering them
+SECTIONS = {
+    "📊 View Data": "render_view_tab",
+    "➕ Add Entry": "render_add_tab",
+    "✏️ Edit Entry": "render_edit_tab",
+    "🗑️ Delete Entry": "render_delete_tab",
+}
+
+# Shows span timings and pool/cache statistics at the bottom of the page
+SHOW_METRICS_PANEL = os.getenv('SHOW_METRICS_PANEL', '') not in ('', '0', 'false')
+
+# Address of an authenticated proxy in front of the lookup server; when set, exports stream from its /export endpoint instead of through Streamlit
+EXPORT_URL = os.getenv('EXPORT_URL', '').rstrip('/')
+
+class CountryCurrencyUI:
+    """Class to handle the Streamlit UI"""
+    
+    # File: src/ui.py (modified __init__ method)
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        
+        # Initialize session state for tracking operations
+        if 'operation_performed' not in st.session_state:
+            st.session_state.operation_performed = False
+        if 'operation_message' not in st.session_state:
+            st.session_state.operation_message = ""
+        if 'operation_status' not in st.session_state:
+            st.session_state.operation_status = ""
+        
+        # Data is loaded on first use, so the header renders while a prefetch is still running
+        self._table = None
+    
+    @property
+    def table(self):
+        """The shared country table, served from the cache which successful writes patch in place"""
+        if self._table is None:
+            self._table = self.db_manager.get_country_table()
+        return self._table
+    
+    @property
+    def data(self):
+        """The country table as a DataFrame"""
+        return self.table.frame
+    
+    def set_operation_status(self, message, status):
+        """Set operation status in session state and trigger rerun"""
+        st.session_state.operation_performed = True
+        st.session_state.operation_message = message
+        st.session_state.operation_status = status
+        st.rerun()
+    
+    def display_operation_feedback(self):
+        """Display operation feedback messages with custom styling"""
+        if st.session_state.operation_performed:
+            if st.session_state.operation_status == "success":
+                render_html(success_message(st.session_state.operation_message))
+            else:
+                render_html(error_message(st.session_state.operation_message))
+            # Reset the flag after displaying
+            st.session_state.operation_performed = False
+    
+    @metrics.timed("ui.view_tab")
+    def render_view_tab(self):
+        """Render the View tab with enhanced styling"""
+        render_html(section_header("📊", "View Countries and Currencies"))
+        
+        # Writes are patched into the shared table, so a reload is only needed
+        # to pick up changes made outside this app
+        if st.button("🔄 Refresh Data", key="view_refresh"):
+            self.db_manager.refresh_in_background()
+            st.rerun()
+        if self.db_manager.is_refreshing():
+            st.caption("Reloading data in the background, showing the last loaded copy.")
+        
+        # Search card
+        render_html(
+            card_start(),
+            field_label("Search by Country Name", "Enter a partial or full country name to filter the data.")
+        )
+        
+        country = st.text_input("", placeholder="Type country name here...", key="view_country_filter")
+        
+        # Sort card, sent together with the end of the search card
+        render_html(
+            card_end(),
+            card_start(),
+            field_label("Sort Data", "Choose a column and sort direction to organize the data.")
+        )
+        
+        paged = self.db_manager.view_mode in ("pushdown", "arrow")
+        columns = st.columns(3 if paged else 2)
+        with columns[0]:
+            sort_column = st.selectbox("Column", self.db_manager.COLUMNS)
+        with columns[1]:
+            sort_order = st.radio("Order", ["Ascending", "Descending"])
+        page_size = PAGE_SIZES[0]
+        if paged:
+            with columns[2]:
+                page_size = st.selectbox("Rows per page", PAGE_SIZES, key="view_page_size")
+        
+        ascending = True if sort_order == "Ascending" else False
+        
+        # Slots are filled in as results arrive, so the first rows show before the count
+        badge_slot = st.empty()
+        render_html(dataframe_container_start())
+        table_slot = st.empty()
+        render_html(dataframe_container_end())
+        
+        if self.db_manager.view_mode == "pushdown":
+            # Let the warehouse filter, sort and page so only the shown rows are fetched.
+            # The count runs in the background while the page streams in.
+            page = st.session_state.get("view_page", 1)
+            count_future = self.db_manager.submit(self.db_manager.count_countries, country)
+            self.stream_page(table_slot, country, sort_column, ascending, page_size, page)
+            count = count_future.result()
+            
+            if self.current_page(count, page_size)[0] != page:
+                # The search shrank the results below the current page
+                page = st.session_state.view_page
+                self.stream_page(table_slot, country, sort_column, ascending, page_size, page)
+        elif self.db_manager.view_mode == "arrow":
+            # Filter and sort in Arrow and convert only the page being shown
+            with metrics.span("ui.search"):
+                positions = self.table.search_positions("country", country) if country else None
+            with metrics.span("ui.sort"):
+                results = self.table.sorted(sort_column, ascending, positions)
+            count = results.num_rows
+            page = self.current_page(count, page_size)[0]
+            with metrics.span("ui.dataframe", rows=min(page_size, count)):
+                table_slot.dataframe(results.slice((page - 1) * page_size, page_size).to_pandas(), use_container_width=True)
+        else:
+            # Sorting takes rows in an order cached per column, so it is not redone on every rerun
+            with metrics.span("ui.search"):
+                positions = self.table.search_positions("country", country) if country else None
+            with metrics.span("ui.sort"):
+                results = self.table.sorted(sort_column, ascending, positions)
+            count = len(results)
+            with metrics.span("ui.dataframe", rows=count):
+                table_slot.dataframe(results, use_container_width=True)
+        
+        if paged:
+            page_count = self.current_page(count, page_size)[1]
+            st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key="view_page")
+        
+        if country:
+            render_html(results_badge(count, country), container=badge_slot)
+        self.render_export(country, sort_column, ascending)
+        render_html(card_end())
+    
+    def render_export(self, country, sort_column, ascending):
+        """Offer every row of the current search and sort, not just the page shown, as a file"""
+        columns = st.columns([1, 3])
+        with columns[0]:
+            file_format = st.selectbox(
+                "Export as", list(export.FORMATS), format_func=lambda name: export.FORMATS[name][0],
+                key="view_export_format"
+            )
+        with columns[1]:
+            # Bottom-aligned with the format box
+            st.write("")
+            if EXPORT_URL:
+                query = urlencode({
+                    "format": file_format, "search": country, "sort": sort_column,
+                    "order": "asc" if ascending else "desc",
+                })
+                st.link_button("⬇️ Export", f"{EXPORT_URL}/export?{query}")
+            else:
+                # The file is only written when the button is clicked, not on every rerun
+                st.download_button(
+                    "⬇️ Export", data=lambda: self.export_file(country, sort_column, ascending, file_format),
+                    file_name=f"countries.{file_format}", mime=export.FORMATS[file_format][1],
+                    on_click="ignore", key="view_export"
+                )
+    
+    def export_file(self, country, sort_column, ascending, file_format):
+        """Write the rows of a search and sort to a temporary file batch by batch, and return it opened for reading"""
+        # Unbuffered, so it is a FileIO (a RawIOBase), one of the file types Streamlit downloads accept
+        spool = tempfile.TemporaryFile(buffering=0)
+        with metrics.span("ui.export", format=file_format) as span:
+            batches = self.db_manager.iter_export(country, sort_column, ascending)
+            span.update(bytes=export.write(batches, file_format, spool, self.db_manager.COLUMNS))
+        spool.seek(0)
+        return spool
+    
+    def current_page(self, count, page_size):
+        """Return the selected page, clamped to the results, and the number of pages"""
+        page_count = max(1, -(-count // page_size))
+        if st.session_state.get("view_page", 1) > page_count:
+            st.session_state.view_page = page_count
+        return st.session_state.get("view_page", 1), page_count
+    
+    def stream_page(self, table_slot, country, sort_column, ascending, page_size, page):
+        """Render a page fetched from the warehouse, showing the first batch as soon as it arrives"""
+        frames = []
+        for batch in self.db_manager.iter_countries_page(
+            country, sort_column, ascending, limit=page_size, offset=(page - 1) * page_size
+        ):
+            # Each batch is converted once; the whole page is rendered once, when complete
+            frames.append(batch.to_pandas())
+            if len(frames) == 1:
+                with metrics.span("ui.dataframe", rows=batch.num_rows):
+                    table_slot.dataframe(frames[0], use_container_width=True)
+        if not frames:
+            table_slot.dataframe(pd.DataFrame(columns=self.db_manager.COLUMNS), use_container_width=True)
+        elif len(frames) > 1:
+            shown = pd.concat(frames, ignore_index=True)
+            with metrics.span("ui.dataframe", rows=len(shown)):
+                table_slot.dataframe(shown, use_container_width=True)
+    
+    @metrics.timed("ui.add_tab")
+    def render_add_tab(self):
+        """Render the Add Entry tab with enhanced styling"""
+        render_html(section_header("➕", "Add New Country/Currency Entry"), card_start())
+        # Form for creating a new entry
+        with st.form(key="add_entry_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                render_html(
+                    field_label("Country Information"),
+                    tooltip_field("Country Code (ISO Alpha-3)", "Three-letter country code (e.g., USA, GBR)")
+                )
+                new_country_code = st.text_input("", placeholder="e.g. USA", max_chars=3, key="add_code").upper()
+                
+                render_html(tooltip_field("Country Number", "Numeric code assigned to the country"))
+                new_country_number = st.text_input("", placeholder="e.g. 840", key="add_country_num")
+                
+                render_html(tooltip_field("Country Name", "Full official name of the country"))
+                new_country = st.text_input("", placeholder="e.g. UNITED STATES", key="add_country_name").upper()
+            
+            with col2:
+                render_html(
+                    field_label("Currency Information"),
+                    tooltip_field("Currency Name", "Full name of the country's currency")
+                )
+                new_currency_name = st.text_input("", placeholder="e.g. US Dollar", key="add_currency_name")
+                
+                render_html(tooltip_field("Currency Code", "Three-letter currency code (e.g., USD, EUR)"))
+                new_currency_code = st.text_input("", placeholder="e.g. USD", max_chars=3, key="add_currency_code").upper()
+                
+                render_html(tooltip_field("Currency Number", "Numeric code assigned to the currency"))
+                new_currency_number = st.text_input("", placeholder="e.g. 840", key="add_currency_num")
+            
+            render_html('<br>')
+            submit_button = st.form_submit_button(label="➕ Add New Entry")
+            
+            if submit_button:
+                # Validate inputs
+                if not (new_country_code and new_country_number and new_country and 
+                        new_currency_name and new_currency_code and new_currency_number):
+                    self.set_operation_status("All fields are required!", "error")
+                else:
+                    try:
+                        # Check if country code already exists
+                        if self.table.contains('country_code', new_country_code):
+                            self.set_operation_status(f"Country code {new_country_code} already exists!", "error")
+                        else:
+                            success = self.db_manager.add_country(
+                                new_country_code, new_country_number, new_country,
+                                new_currency_name, new_currency_code, new_currency_number
+                            )
+                            
+                            if success:
+                                self.set_operation_status("Entry added successfully!", "success")
+                            else:
+                                self.set_operation_status("Failed to add entry. Please try again.", "error")
+                    except Exception as e:
+                        self.set_operation_status(f"Error: {str(e)}", "error")
+        
+        # Bulk import card, sent together with the end of the form card
+        render_html(
+            card_end(),
+            card_start(),
+            field_label("Bulk Import from CSV", 
+                        "Upload a CSV with the same columns as the table. Rows are matched on "
+                        "country code, country and currency code, then updated or added.")
+        )
+        uploaded_file = st.file_uploader("", type="csv", key="bulk_import_file")
+        if uploaded_file and st.button("📥 Import CSV", key="bulk_import_button"):
+            try:
+                report = import_csv(self.db_manager, uploaded_file)
+                if report.rows_rejected:
+                    self.set_operation_status(f"{report.summary()}. {report.errors[0]}", "error")
+                else:
+                    self.set_operation_status(report.summary(), "success")
+            except Exception as e:
+                self.set_operation_status(f"Error: {str(e)}", "error")
+        render_html(card_end())
+    
+    @metrics.timed("ui.edit_tab")
+    def render_edit_tab(self):
+        """Render the Edit Entry tab with enhanced styling"""
+        render_html(section_header("✏️", "Edit Existing Entry"))
+        
+        if st.checkbox("Edit several rows at once", key="edit_bulk_mode"):
+            self.render_bulk_edit()
+            return
+        
+        render_html(
+            card_start(),
+            field_label("Select Country to Edit", "Choose the country record you want to modify.")
+        )
+        
+        # First, select a country to edit
+        country_to_edit = st.selectbox(
+            "",
+            options=self.table.values('country'),
+            format_func=lambda x: x,
+            index=0
+        )
+        
+        # Get the selected country's data
+        selected_row = self.table.get('country', country_to_edit)
+        
+        # Display current data
+        render_html('<div style="margin-top: 20px;">', field_label("Current Data:"), dataframe_container_start())
+        st.dataframe(pd.DataFrame([selected_row]), use_container_width=True)
+        render_html(dataframe_container_end(), '</div>')
+        
+        # Form for editing
+        with st.form(key="edit_entry_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                render_html(
+                    field_label("Country Information"),
+                    tooltip_field("Country Code (ISO Alpha-3)", "Three-letter country code (e.g., USA, GBR)")
+                )
+                edit_country_code = st.text_input("", 
+                                               value=selected_row['country_code'], 
+                                               max_chars=3,
+                                               key="edit_code").upper()
+                
+                render_html(tooltip_field("Country Number", "Numeric code assigned to the country"))
+                edit_country_number = st.text_input("", 
+                                                 value=str(selected_row['country_number']),
+                                                 key="edit_country_num")
+                
+                render_html(tooltip_field("Country Name", "Full official name of the country"))
+                edit_country = st.text_input("", 
+                                          value=selected_row['country'],
+                                          key="edit_country_name").upper()
+            
+            with col2:
+                render_html(
+                    field_label("Currency Information"),
+                    tooltip_field("Currency Name", "Full name of the country's currency")
+                )
+                edit_currency_name = st.text_input("", 
+                                               value=selected_row['currency_name'],
+                                               key="edit_currency_name")
+                
+                render_html(tooltip_field("Currency Code", "Three-letter currency code (e.g., USD, EUR)"))
+                edit_currency_code = st.text_input("", 
+                                               value=selected_row['currency_code'], 
+                                               max_chars=3,
+                                               key="edit_currency_code").upper()
+                
+                render_html(tooltip_field("Currency Number", "Numeric code assigned to the currency"))
+                edit_currency_number = st.text_input("", 
+                                                 value=str(selected_row['currency_number']),
+                                                 key="edit_currency_num")
+            
+            render_html('<br>')
+            submit_button = st.form_submit_button(label="✅ Update Entry")
+            
+            if submit_button:
+                # Validate inputs
+                if not (edit_country_code and edit_country_number and edit_country and 
+                        edit_currency_name and edit_currency_code and edit_currency_number):
+                    self.set_operation_status("All fields are required!", "error")
+                else:
+                    try:
+                        success = self.db_manager.update_country(
+                            selected_row['country_code'],  # Original code
+                            edit_country_code, edit_country_number, edit_country,
+                            edit_currency_name, edit_currency_code, edit_currency_number
+                        )
+                        
+                        if success:
+                            self.set_operation_status("Entry updated successfully!", "success")
+                        else:
+                            self.set_operation_status("Failed to update entry. Please try again.", "error")
+                    except Exception as e:
+                        self.set_operation_status(f"Error: {str(e)}", "error")
+        render_html(card_end())
+    
+    def render_bulk_edit(self):
+        """Render a grid editor that saves all changed rows in one batch"""
+        render_html(
+            card_start(),
+            field_label("Edit Table", "Change cells, add rows at the bottom or delete selected rows, then save all changes together.")
+        )
+        
+        # The key follows the table version so the grid starts clean once saved edits are patched in
+        # Categorical columns would only offer their existing values in the grid, and narrow integers would wrap
+        edited_data = st.data_editor(
+            expand(self.data),
+            num_rows="dynamic",
+            use_container_width=True,
+            key=f"bulk_editor_{self.table.version}"
+        )
+        edits = diff_table(self.table, edited_data)
+        
+        if edits.errors:
+            render_html(*(error_message(error) for error in edits.errors))
+        elif edits:
+            render_html(pending_changes(edits.summary()))
+            
+            if st.button("💾 Save All Changes", type="primary", key="bulk_edit_save"):
+                try:
+                    success = self.db_manager.save_edits(edits)
+                    
+                    if success:
+                        self.set_operation_status(f"Saved {edits.summary()}!", "success")
+                    else:
+                        self.set_operation_status("Failed to save changes. Please try again.", "error")
+                except Exception as e:
+                    self.set_operation_status(f"Error: {str(e)}", "error")
+        render_html(card_end())
+    
+    @metrics.timed("ui.delete_tab")
+    def render_delete_tab(self):
+        """Render the Delete Entry tab with enhanced styling"""
+        render_html(
+            section_header("🗑️", "Delete Entry"),
+            delete_warning(),
+            card_start(),
+            field_label("Select Country to Delete", "Choose the country record you want to remove from the database.")
+        )
+        
+        # Select a country to delete
+        country_to_delete = st.selectbox(
+            "",
+            options=self.table.values('country'),
+            format_func=lambda x: x,
+            key="delete_country"
+        )
+        
+        # Get the selected country's data
+        if country_to_delete:
+            selected_row = self.table.get('country', country_to_delete)
+            
+            # Display the selected entry
+            render_html(
+                '<div style="margin-top: 20px;">', field_label("Entry to delete:"), dataframe_container_start("#e74c3c")
+            )
+            st.dataframe(pd.DataFrame([selected_row]), use_container_width=True)
+            
+            # Confirmation, sent together with the end of the dataframe container
+            confirmation_container = st.container()
+            with confirmation_container:
+                render_html(dataframe_container_end(), delete_confirmation())
+                delete_confirmation_checkbox = st.checkbox("I confirm that I want to delete this entry")
+            
+            # Using custom CSS for the delete button
+            if delete_confirmation_checkbox:
+                if st.button("🗑️ Delete Entry", type="primary"):
+                    try:
+                        success = self.db_manager.delete_country(selected_row['country_code'])
+                        
+                        if success:
+                            self.set_operation_status("Entry deleted successfully!", "success")
+                        else:
+                            self.set_operation_status("Failed to delete entry. Please try again.", "error")
+                    except Exception as e:
+                        self.set_operation_status(f"Error: {str(e)}", "error")
+            else:
+                render_html(disabled_button())
+            
+            render_html('</div>', card_end())
+    
+    def render_metrics_panel(self):
+        """Render span timings and pool/cache statistics for diagnosing slow pages"""
+        with st.expander("⏱️ Performance metrics"):
+            st.dataframe(pd.DataFrame(metrics.summary()), use_container_width=True)
+            columns = st.columns(3)
+            with columns[0]:
+                st.caption("Connection pool")
+                st.json(self.db_manager.pool_stats())
+            with columns[1]:
+                st.caption("Table cache")
+                st.json(self.db_manager.cache_stats())
+            with columns[2]:
+                st.caption("Statements")
+                st.json(self.db_manager.statement_stats())
+    
+    @st.fragment
+    def render_section(self, section):
+        """Render one section as a fragment, so its widgets rerun only the section"""
+        # Fragment reruns reuse this object, so read the shared table afresh
+        self._table = None
+        # Reads an earlier run of this session left running on the warehouse are cancelled there
+        st.session_state.statement_run = self.db_manager.begin_run(st.session_state.get("statement_run"))
+        getattr(self, SECTIONS[section])()
+    
+    def render(self):
+        """Render the full UI with enhanced styling"""
+        # App title with HTML
+        render_html(app_header())
+        
+        # Display operation feedback if any
+        self.display_operation_feedback()
+        
+        # Unlike st.tabs, which builds every tab on each run, only the selected section is built
+        section = st.radio(
+            "Section", list(SECTIONS), horizontal=True, label_visibility="collapsed", key="active_section"
+        )
+        self.render_section(section)
+        
+        if SHOW_METRICS_PANEL:
+            self.render_metrics_panel()
+        
+        # Footer
+        render_html(footer())
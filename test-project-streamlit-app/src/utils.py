@@ -1,6 +1,18 @@
-# File: src/utils.py
-
-def load_css(css_file_path):
-    """Load CSS from a file and inject it into the Streamlit app"""
-    with open(css_file_path, 'r') as f:
-        return f'<style>{f.read()}</style>'
+# File: src/utils.py
+from functools import lru_cache
+
+import streamlit as st
+
+from templates.html_components import compile_html
+
+@lru_cache(maxsize=None)
+def load_css(css_file_path):
+    """Load CSS from a file and inject it into the Streamlit app, reading the file once per process"""
+    with open(css_file_path, 'r') as f:
+        return f'<style>{f.read()}</style>'
+
+def render_html(*fragments, container=st):
+    """Render HTML fragments as one markdown element, sending nothing when they compile to nothing"""
+    html = compile_html(*fragments)
+    if html:
+        container.markdown(html, unsafe_allow_html=True)
@@ -0,0 +1,56 @@
+# File: tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# DatabaseManager insists on a warehouse id, and snapshots should not land next to the app's own
+os.environ.setdefault("DATABRICKS_WAREHOUSE_ID", "tests")
+os.environ.setdefault("COUNTRY_SNAPSHOT_DIR", "")
+
+from benchmarks.fake_sql import FakeConfig, FakeSql
+from benchmarks.synthetic import synthetic_countries
+from src.database import DatabaseManager
+
+
+class RecordingSql(FakeSql):
+    """FakeSql that records the statements it runs and can fail the next ones on demand"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.statements = []
+        self._failures = []
+
+    def fail_next(self, error, count=1):
+        """Raise error from the next count statements instead of running them"""
+        self._failures.extend([error] * count)
+
+    def translate(self, query):
+        self.statements.append(" ".join(query.split()))
+        if self._failures:
+            raise self._failures.pop(0)
+        return super().translate(query)
+
+    def executed(self, prefix):
+        """Return the recorded statements starting with prefix"""
+        return [statement for statement in self.statements if statement.upper().startswith(prefix.upper())]
+
+
+@pytest.fixture
+def sql():
+    sql = RecordingSql()
+    sql.load(synthetic_countries(265))
+    return sql
+
+
+@pytest.fixture
+def db(sql):
+    # Every FakeSql is a warehouse of its own, so each test gets its own pool and cached table
+    return DatabaseManager(connector=sql, cfg=FakeConfig(), view_mode="memory")
+
+
+@pytest.fixture
+def snapshot_dir(monkeypatch):
+    with tempfile.TemporaryDirectory(prefix="country_tests_") as directory:
+        monkeypatch.setenv("COUNTRY_SNAPSHOT_DIR", directory)
+        yield directory
@@ -0,0 +1,55 @@
+# File: tests/test_cache.py
+import threading
+
+import pandas as pd
+
+from src.cache import SharedCache
+from src.database import table_cache
+from src.query_builder import COLUMNS
+
+
+def test_restarted_refresh_supersedes_a_load_in_flight():
+    cache = SharedCache()
+    started, release = threading.Event(), threading.Event()
+
+    def old_load():
+        started.set()
+        release.wait()
+        return "before the write"
+
+    loading = threading.Thread(target=cache.refresh, args=("key", old_load))
+    loading.start()
+    started.wait()
+
+    assert cache.refresh("key", lambda: "after the write", restart=True) == "after the write"
+    release.set()
+    loading.join()
+    assert cache.peek("key") == "after the write"
+
+
+def test_upsert_keeps_serving_the_cached_table_while_it_refreshes(db, sql):
+    table = db.get_country_table()
+    del sql.statements[:]
+    rows = pd.DataFrame([["X9X", 999, "TESTIA", "TEST DOLLAR", "TST", 999]], columns=COLUMNS)
+
+    refreshing = threading.Event()
+    refreshed = threading.Event()
+    original_refresh = db.refresh_country_table
+
+    def refresh_country_table(restart=False):
+        refreshing.wait()
+        try:
+            return original_refresh(restart)
+        finally:
+            refreshed.set()
+
+    db.refresh_country_table = refresh_country_table
+    db.upsert_countries([rows])
+
+    # The copy from before the upsert is still served until the refresh is done
+    assert table_cache.peek(db.cache_key) is table
+    refreshing.set()
+    refreshed.wait(10)
+
+    assert sql.executed("DESCRIBE HISTORY")
+    assert db.get_country_table().contains("country_code", "X9X")
@@ -0,0 +1,38 @@
+# File: tests/test_change_feed.py
+def _write_outside_the_app(sql):
+    sql.database.execute(
+        "UPDATE test_project.country_code_to_currency.country_currency_table SET country_number = country_number + 1"
+    )
+    sql.version += 1
+
+
+def _kinds(statements):
+    return [statement.split(None, 1)[0].upper() for statement in statements]
+
+
+def test_unavailable_change_feed_is_probed_once_per_process(db, sql):
+    db.get_country_table()
+
+    _write_outside_the_app(sql)
+    del sql.statements[:]
+    db.refresh_country_table()
+    # The version read up front is reused by the full reload, and the failed feed read is not retried
+    assert _kinds(sql.statements) == ["DESCRIBE", "SELECT", "SELECT"]
+    assert len(sql.executed("SELECT * FROM table_changes")) == 1
+
+    _write_outside_the_app(sql)
+    del sql.statements[:]
+    table = db.refresh_country_table()
+    assert _kinds(sql.statements) == ["DESCRIBE", "SELECT"]
+    assert not sql.executed("SELECT * FROM table_changes")
+    assert table.source_version == sql.version
+
+    assert db.pool_stats()["reconnects"] == 0
+
+
+def test_unchanged_table_is_kept_after_reading_its_version(db, sql):
+    table = db.get_country_table()
+    del sql.statements[:]
+
+    assert db.refresh_country_table() is table
+    assert _kinds(sql.statements) == ["DESCRIBE"]
@@ -0,0 +1,26 @@
+# File: tests/test_export.py
+import io
+import time
+
+import pyarrow.csv as pa_csv
+
+from benchmarks.fake_sql import FakeConfig
+from src import export
+from src.database import DatabaseManager
+
+
+def test_slow_consumer_does_not_count_against_the_query_deadline(sql):
+    db = DatabaseManager(connector=sql, cfg=FakeConfig(), view_mode="pushdown", query_timeout=0.5)
+    chunks = export.stream(db.iter_export("", "country", True, batch_rows=50), "csv", DatabaseManager.COLUMNS)
+
+    cancelled = db.statement_stats()["cancelled_deadline"]
+    data = io.BytesIO()
+    started = time.monotonic()
+    for chunk in chunks:
+        data.write(chunk)
+        # A client downloading slowly takes far longer than the deadline over the whole export
+        time.sleep(0.2)
+
+    assert time.monotonic() - started > 1
+    assert pa_csv.read_csv(io.BytesIO(data.getvalue())).num_rows == 265
+    assert db.statement_stats()["cancelled_deadline"] == cancelled
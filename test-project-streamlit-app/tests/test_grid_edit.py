@@ -0,0 +1,76 @@
+# File: tests/test_grid_edit.py
+import pandas as pd
+
+from src.database import EDIT_BATCH_ROWS, table_cache
+from src.grid_edit import diff_table
+from src.query_builder import COLUMNS
+
+
+def _warehouse_rows(db):
+    rows = db.query("SELECT * FROM test_project.country_code_to_currency.country_currency_table")
+    return rows[COLUMNS].sort_values(COLUMNS).reset_index(drop=True)
+
+
+def test_large_edit_is_saved_in_capped_batches_and_patched_into_the_cache(db, sql):
+    table = db.get_country_table()
+    edited = table.frame[COLUMNS].astype(object)
+    # Rename the first 100 countries, delete the next 20 and add 30 new ones
+    edited.loc[edited.index[:100], "country"] = [f"EDITED {i}" for i in range(100)]
+    edited = edited.drop(edited.index[100:120])
+    new_rows = pd.DataFrame({
+        "country_code": [f"Z{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(30)],
+        "country_number": range(900, 930),
+        "country": [f"NEW {i}" for i in range(30)],
+        "currency_name": "NEW DOLLAR",
+        "currency_code": "NWD",
+        "currency_number": 999,
+    }, index=range(10_000, 10_030))
+    edited = pd.concat([edited, new_rows])
+
+    edits = diff_table(table, edited)
+    assert not edits.errors
+    assert db.save_edits(edits)
+
+    merges = sql.executed("MERGE")
+    assert len(merges) == -(-150 // EDIT_BATCH_ROWS)
+    assert all(merge.count("?") <= EDIT_BATCH_ROWS * 10 for merge in merges)
+
+    cached = db.get_country_table()
+    assert cached.version != table.version
+    assert len(cached) == len(table) - 20 + 30
+    # The cache was patched rather than reloaded
+    assert len(sql.executed("SELECT * FROM")) == 1
+    expected = edited[COLUMNS].astype({"country_number": int, "currency_number": int})
+    pd.testing.assert_frame_equal(
+        _warehouse_rows(db), expected.sort_values(COLUMNS).reset_index(drop=True), check_dtype=False
+    )
+    pd.testing.assert_frame_equal(
+        cached.frame[COLUMNS].astype(object).sort_values(COLUMNS).reset_index(drop=True),
+        expected.astype(object).sort_values(COLUMNS).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_failed_batch_invalidates_the_cache(db, sql):
+    table = db.get_country_table()
+    edited = table.frame[COLUMNS].astype(object)
+    edited.loc[edited.index[:50], "country"] = [f"EDITED {i}" for i in range(50)]
+    edits = diff_table(table, edited)
+
+    # The second MERGE fails after the first was applied
+    original_translate = sql.translate
+    merges = []
+
+    def translate(query):
+        if query.startswith("MERGE"):
+            merges.append(query)
+            if len(merges) == 2:
+                raise ValueError("Batch failed")
+        return original_translate(query)
+
+    sql.translate = translate
+    assert not db.save_edits(edits)
+    sql.translate = original_translate
+
+    # The first batch stays applied, so the cached table no longer matches the warehouse
+    assert table_cache.peek(db.cache_key) is None
@@ -0,0 +1,73 @@
+# File: tests/test_pool.py
+import duckdb
+
+from src.pool import ConnectionPool
+
+
+def test_failing_write_runs_once_and_keeps_its_connection(db, sql):
+    db.query("SELECT 1")
+    inserts = len(sql.executed("INSERT"))
+
+    # A country number that is not a number fails the statement, not the connection
+    assert not db.add_country("X9X", "not a number", "TESTIA", "TEST DOLLAR", "TST", 999)
+
+    assert len(sql.executed("INSERT")) == inserts + 1
+    stats = db.pool_stats()
+    assert stats["reconnects"] == 0
+    assert stats["misses"] == 1
+    assert stats["idle"] == 1
+
+
+def test_write_is_not_retried_after_losing_its_connection(db, sql):
+    db.query("SELECT 1")
+    sql.fail_next(duckdb.ConnectionException("Connection lost"))
+
+    assert not db.add_country("X9X", 999, "TESTIA", "TEST DOLLAR", "TST", 999)
+
+    assert len(sql.executed("INSERT")) == 1
+    assert db.pool_stats()["reconnects"] == 0
+    assert db.pool_stats()["idle"] == 0
+
+
+def test_read_is_retried_on_a_new_connection_after_losing_its_connection(db, sql):
+    db.query("SELECT 1")
+    sql.fail_next(duckdb.ConnectionException("Connection lost"))
+
+    assert db.query("SELECT 2 AS two")["two"].iloc[0] == 2
+
+    stats = db.pool_stats()
+    assert stats["reconnects"] == 1
+    assert stats["misses"] == 2
+    assert stats["idle"] == 1
+
+
+def test_failing_read_is_not_retried(db, sql):
+    db.query("SELECT 1")
+
+    try:
+        db.query("SELECT * FROM missing_table")
+    except duckdb.CatalogException:
+        pass
+    else:
+        raise AssertionError("The query should have failed")
+
+    assert len(sql.executed("SELECT * FROM missing_table")) == 1
+    assert db.pool_stats()["reconnects"] == 0
+    assert db.pool_stats()["idle"] == 1
+
+
+def test_connection_reporting_itself_closed_is_discarded():
+    class Connection:
+        open = True
+
+    def work(connection):
+        connection.open = False
+        raise RuntimeError("Session expired")
+
+    pool = ConnectionPool(Connection)
+    try:
+        pool.run(work, retries=0)
+    except RuntimeError:
+        pass
+    assert pool.stats()["idle"] == 0
+    assert pool.stats()["in_use"] == 0